@@ -0,0 +1,255 @@
+import json
+import os
+import threading
+import time
+
+# =========================================================
+# Catalogue FR : JEJU + SEOUL (Spots, Restaurants, Itinéraires)
+# =========================================================
+# kakao_mapFR.py 지도 페이지와 로컬 검색 인덱스가 함께 사용하는 카탈로그입니다.
+# 데이터는 data/catalog_fr.json (CATALOG_FR_PATH로 변경 가능)에 있고, 재시작 없이 수정할 수 있습니다.
+#   - CITY_DATA / CITY_ROUTES 는 프로세스 내내 같은 dict 객체를 유지
+#   - 파일이 바뀌면 (도시, 종류, id) 단위로 비교해 달라진 레코드만 제자리에서 교체
+#   - 목록은 항상 파일 순서를 따름 (순서만 바꾼 수정도 반영)
+#   - 구독자(필터 인덱스, 검색 인덱스, 지도 번들 캐시)는 CatalogChange를 받아 해당 부분만 갱신
+
+CATALOG_PATH = os.getenv(
+    "CATALOG_FR_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "catalog_fr.json")
+)
+POLL_INTERVAL_S = 1.0   # 파일 변경 확인 최소 간격 (os.stat 한 번)
+
+RECORD_KINDS = ("spots", "restos")
+CITY_META_KEYS = ("areas", "map_center", "map_level")
+
+# 레코드 필수 필드와 타입 (페이지/인덱스가 p[...]로 바로 읽는 필드)
+NUMBER = (int, float)
+RECORD_FIELDS = {"id": str, "name": str, "area": str, "lat": NUMBER, "lng": NUMBER, "type": str, "desc_fr": str}
+KIND_FIELDS = {"spots": {"price_krw": NUMBER}, "restos": {"rating": NUMBER, "menu": list}}
+KIND_TYPES = {"spots": "Spot", "restos": "Resto"}
+MENU_FIELDS = {"name": str, "price_krw": NUMBER}
+
+
+def _check_fields(where: str, obj, fields: dict):
+    if not isinstance(obj, dict):
+        raise ValueError(f"{where}: objet attendu")
+    for key, types in fields.items():
+        value = obj.get(key)
+        # bool은 int의 하위 클래스이므로 숫자 필드에서 따로 거부
+        if not isinstance(value, types) or isinstance(value, bool):
+            raise ValueError(f"{where}: champ '{key}' manquant ou invalide")
+
+
+def validate_city(city_key: str, city: dict):
+    """
+    도시 하나의 형식을 확인합니다 (잘못되면 ValueError).
+    반영 전에 전부 확인하므로 poll()이 카탈로그를 절반만 바꾸는 일이 없습니다.
+    """
+    _check_fields(city_key, city, {"areas": list, "map_center": list, "map_level": int,
+                                   "spots": list, "restos": list, "routes": dict})
+    if len(city["map_center"]) != 2:
+        raise ValueError(f"{city_key}: 'map_center' doit contenir [lat, lng]")
+
+    # 필터 인덱스 / 지도 상세 정보 / 검색 인덱스는 도시 안에서 id만으로 장소를 찾으므로
+    # spots와 restos를 합쳐 id가 유일해야 함
+    seen = set()
+    for kind in RECORD_KINDS:
+        for i, p in enumerate(city[kind]):
+            where = f"{city_key}/{kind}[{i}]"
+            _check_fields(where, p, {**RECORD_FIELDS, **KIND_FIELDS[kind]})
+            if p["type"] != KIND_TYPES[kind]:
+                raise ValueError(f"{where}: type '{p['type']}' (attendu '{KIND_TYPES[kind]}')")
+            for j, m in enumerate(p.get("menu", [])):
+                _check_fields(f"{where}/menu[{j}]", m, MENU_FIELDS)
+            if p["id"] in seen:
+                raise ValueError(f"{city_key}: id en double '{p['id']}' ({kind})")
+            seen.add(p["id"])
+
+    for rn, days in city["routes"].items():
+        if not isinstance(days, list):
+            raise ValueError(f"{city_key}/{rn}: liste de jours attendue")
+        for j, d in enumerate(days):
+            _check_fields(f"{city_key}/{rn}[{j}]", d, {"day": str, "spots": list})
+
+
+def load_catalog(path: str = CATALOG_PATH) -> tuple[dict, dict]:
+    """카탈로그 파일 -> (CITY_DATA, CITY_ROUTES). 형식이 잘못되면 ValueError."""
+    with open(path, encoding="utf-8") as f:
+        raw = json.load(f)
+    if not isinstance(raw, dict) or not isinstance(raw.get("cities"), dict):
+        raise ValueError("champ 'cities' manquant ou invalide")
+
+    city_data, city_routes = {}, {}
+    for city_key, city in raw["cities"].items():
+        validate_city(city_key, city)
+        city_data[city_key] = {
+            "areas": city["areas"],
+            "map_center": tuple(city["map_center"]),
+            "map_level": city["map_level"],
+            "spots": city["spots"],
+            "restos": city["restos"],
+        }
+        city_routes[city_key] = city["routes"]
+    return city_data, city_routes
+
+
+class CatalogChange:
+    """
+    두 카탈로그 사이의 차이.
+      - records : (도시, "spots"/"restos", 이전 레코드 | None, 새 레코드 | None), 삭제가 먼저
+      - cities  : 추가/삭제되었거나 areas/map_center/map_level이 바뀐 도시
+      - routes  : 도시 -> 바뀐(추가/삭제 포함) 일정 이름 집합
+      - reordered : 증분 반영(남은 레코드는 제자리, 새 레코드는 끝)만으로는 파일 순서가 되지 않는 도시
+                    -> 구독자는 이 도시의 순서 의존 인덱스를 다시 만듭니다
+    """
+
+    def __init__(self):
+        self.records = []
+        self.cities = set()
+        self.routes = {}
+        self.reordered = set()
+
+    def __bool__(self):
+        return bool(self.records or self.cities or self.routes or self.reordered)
+
+
+def diff_catalog(old_data: dict, old_routes: dict, new_data: dict, new_routes: dict) -> CatalogChange:
+    change = CatalogChange()
+    for city_key in dict.fromkeys([*old_data, *new_data]):
+        old, new = old_data.get(city_key), new_data.get(city_key)
+        if old is None or new is None or any(old[k] != new[k] for k in CITY_META_KEYS):
+            change.cities.add(city_key)
+
+        for kind in RECORD_KINDS:
+            before = {p["id"]: p for p in old[kind]} if old else {}
+            after = {p["id"]: p for p in new[kind]} if new else {}
+            for pid in dict.fromkeys([*before, *after]):
+                if before.get(pid) != after.get(pid):
+                    change.records.append((city_key, kind, before.get(pid), after.get(pid)))
+
+            # 증분 반영 결과(남은 레코드는 제자리, 새 레코드는 끝)가 파일 순서와 다르면 재정렬 필요
+            incremental = [pid for pid in before if pid in after] + [pid for pid in after if pid not in before]
+            if old and new and incremental != list(after):
+                change.reordered.add(city_key)
+
+        old_r, new_r = old_routes.get(city_key, {}), new_routes.get(city_key, {})
+        changed = {rn for rn in dict.fromkeys([*old_r, *new_r]) if old_r.get(rn) != new_r.get(rn)}
+        if changed:
+            change.routes[city_key] = changed
+
+    # 삭제를 먼저 적용 (id가 spots <-> restos로 옮겨 간 경우 새 레코드가 지워지지 않도록)
+    change.records.sort(key=lambda r: r[3] is not None)
+    return change
+
+
+class CatalogStore:
+    """
+    카탈로그 파일 + 변경 감시.
+    poll()은 페이지 리런마다 불러도 되며 (POLL_INTERVAL_S 간격으로 os.stat만 확인),
+    변경이 있으면 달라진 레코드만 반영하고 subscribe()한 콜백에 CatalogChange를 넘깁니다.
+    """
+
+    def __init__(self, path: str = CATALOG_PATH):
+        self.path = path
+        self.stamp = self._stamp()
+        self.city_data, self.city_routes = load_catalog(path)
+        self.spots_by_name = {
+            city_key: {s["name"]: s for s in city["spots"]} for city_key, city in self.city_data.items()
+        }
+        self.listeners = []
+        self.last_error = None
+        self.last_poll = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _stamp(self):
+        info = os.stat(self.path)
+        return (info.st_mtime_ns, info.st_size)
+
+    def subscribe(self, listener):
+        """listener(change: CatalogChange)를 등록합니다."""
+        self.listeners.append(listener)
+
+    def spot_by_name(self, city_key: str, name: str):
+        return self.spots_by_name.get(city_key, {}).get(name)
+
+    def poll(self, force: bool = False) -> CatalogChange | None:
+        now = time.monotonic()
+        if not force and now - self.last_poll < POLL_INTERVAL_S:
+            return None
+        with self.lock:
+            self.last_poll = now
+            try:
+                stamp = self._stamp()
+                if stamp == self.stamp:
+                    return None
+                new_data, new_routes = load_catalog(self.path)
+                change = diff_catalog(self.city_data, self.city_routes, new_data, new_routes)
+                if change:
+                    self._apply(change, new_data, new_routes)
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                # 저장 도중(빈 파일/깨진 JSON)일 수 있으므로 기존 카탈로그를 유지하고 다음 poll에서 재시도
+                # (stamp를 그대로 두므로 파일이 다시 바뀌지 않아도 재시도됨)
+                self.last_error = f"{os.path.basename(self.path)} : {e}"
+                return None
+            self.stamp = stamp
+            self.last_error = None
+
+            # 구독자는 서로 독립: 하나가 실패해도 나머지는 변경을 받음
+            for listener in self.listeners if change else ():
+                try:
+                    listener(change)
+                except Exception as e:
+                    self.last_error = f"{getattr(listener, '__qualname__', listener)} : {e}"
+            return change
+
+    def _apply(self, change: CatalogChange, new_data: dict, new_routes: dict):
+        # 도시 추가/삭제/메타 변경
+        for city_key in change.cities:
+            if city_key not in new_data:
+                self.city_data.pop(city_key, None)
+                self.city_routes.pop(city_key, None)
+                self.spots_by_name.pop(city_key, None)
+            elif city_key not in self.city_data:
+                self.city_data[city_key] = new_data[city_key]
+                self.city_routes[city_key] = new_routes[city_key]
+                self.spots_by_name[city_key] = {s["name"]: s for s in new_data[city_key]["spots"]}
+            else:
+                for k in CITY_META_KEYS:
+                    self.city_data[city_key][k] = new_data[city_key][k]
+
+        # 레코드: 바뀌지 않은 레코드는 기존 dict 객체를 그대로 두고, 목록은 한 번에 교체
+        touched = {(city_key, kind): set() for city_key in change.reordered for kind in RECORD_KINDS}
+        for city_key, kind, old, new in change.records:
+            touched.setdefault((city_key, kind), set()).add((old or new)["id"])
+            if kind == "spots" and city_key in self.spots_by_name:
+                by_name = self.spots_by_name[city_key]
+                if old is not None and by_name.get(old["name"], {}).get("id") == old["id"]:
+                    del by_name[old["name"]]
+                if new is not None:
+                    by_name[new["name"]] = new
+        for (city_key, kind), ids in touched.items():
+            if city_key not in new_data or self.city_data[city_key] is new_data[city_key]:
+                continue
+            current = {p["id"]: p for p in self.city_data[city_key][kind]}
+            self.city_data[city_key][kind][:] = [
+                p if p["id"] in ids else current.get(p["id"], p) for p in new_data[city_key][kind]
+            ]
+
+        # 일정: 바뀐 일정 이름만 교체
+        for city_key, names in change.routes.items():
+            routes = self.city_routes.get(city_key)
+            if routes is None or routes is new_routes.get(city_key):
+                continue
+            for rn in names:
+                if rn in new_routes[city_key]:
+                    routes[rn] = new_routes[city_key][rn]
+                else:
+                    routes.pop(rn, None)
+
+
+catalog = CatalogStore()
+CITY_DATA = catalog.city_data
+CITY_ROUTES = catalog.city_routes
+
+
+def spot_by_name(city_key: str, name: str):
+    return catalog.spot_by_name(city_key, name)
@@ -0,0 +1,163 @@
+import numpy as np
+
+# =========================================================
+# 제공자 응답 좌표 일괄 디코딩 → WGS84 배열
+# =========================================================
+# 응답 한 묶음을 numpy 배열로 바꾼 뒤 투영 변환 / 범위 검사를 한 번에 처리합니다.
+#   - naver       : mapx/mapy = WGS84 * 1e7 정수 (구 응답의 KATEC/TM128 값은 자동 감지해 변환)
+#   - naver_tm128 : mapx/mapy = KATEC(TM128) 미터 좌표
+#   - kakao       : x/y = WGS84 경도/위도 문자열
+# 새 제공자는 @register_decoder("이름")으로 추가합니다.
+
+# 대한민국 주변 (lat_min, lat_max, lng_min, lng_max)
+KOREA_BOUNDS = (32.0, 39.7, 124.0, 132.0)
+
+# WGS84*1e7 정수 경도는 10억 단위, TM128 x 는 수십만 미터 단위
+NAVER_WGS84_MIN_X = 1e8
+
+# KATEC / TM128 : Bessel 1841 타원체, 횡메르카토르, 한국 측지계 -> WGS84 7-파라미터 변환
+BESSEL_A = 6377397.155
+BESSEL_F = 1 / 299.1528128
+WGS84_A = 6378137.0
+WGS84_F = 1 / 298.257223563
+TM128_LAT0 = 38.0
+TM128_LON0 = 128.0
+TM128_K0 = 0.9999
+TM128_FE = 400000.0
+TM128_FN = 600000.0
+# towgs84 (position vector): tx, ty, tz [m], rx, ry, rz [arc-sec], ds [ppm]
+TM128_TOWGS84 = (-115.80, 474.99, 674.11, 1.16, -2.31, -1.63, 6.43)
+
+_DECODERS = {}
+
+
+def register_decoder(provider: str):
+    """decoder(items) -> (lat, lng) float64 배열을 제공자 이름으로 등록합니다."""
+    def wrap(fn):
+        _DECODERS[provider] = fn
+        return fn
+    return wrap
+
+
+def column(items: list[dict], key: str) -> np.ndarray:
+    """응답 필드 하나를 float64 배열로 (빈 값/누락은 NaN)."""
+    return np.array([item.get(key) or np.nan for item in items], dtype=np.float64)
+
+
+def _meridian_arc(phi, a, e2):
+    e4, e6 = e2 * e2, e2 * e2 * e2
+    return a * ((1 - e2 / 4 - 3 * e4 / 64 - 5 * e6 / 256) * phi
+                - (3 * e2 / 8 + 3 * e4 / 32 + 45 * e6 / 1024) * np.sin(2 * phi)
+                + (15 * e4 / 256 + 45 * e6 / 1024) * np.sin(4 * phi)
+                - (35 * e6 / 3072) * np.sin(6 * phi))
+
+
+def tm_inverse(x, y, a, f, lat0, lon0, k0, fe, fn):
+    """횡메르카토르 역변환 (Snyder) -> 해당 타원체의 위도/경도 (라디안)."""
+    e2 = f * (2 - f)
+    ep2 = e2 / (1 - e2)
+    m = _meridian_arc(np.radians(lat0), a, e2) + (y - fn) / k0
+    mu = m / (a * (1 - e2 / 4 - 3 * e2 ** 2 / 64 - 5 * e2 ** 3 / 256))
+    e1 = (1 - np.sqrt(1 - e2)) / (1 + np.sqrt(1 - e2))
+    phi1 = (mu + (3 * e1 / 2 - 27 * e1 ** 3 / 32) * np.sin(2 * mu)
+            + (21 * e1 ** 2 / 16 - 55 * e1 ** 4 / 32) * np.sin(4 * mu)
+            + (151 * e1 ** 3 / 96) * np.sin(6 * mu)
+            + (1097 * e1 ** 4 / 512) * np.sin(8 * mu))
+
+    sin1, cos1, tan1 = np.sin(phi1), np.cos(phi1), np.tan(phi1)
+    c1 = ep2 * cos1 ** 2
+    t1 = tan1 ** 2
+    n1 = a / np.sqrt(1 - e2 * sin1 ** 2)
+    r1 = a * (1 - e2) / (1 - e2 * sin1 ** 2) ** 1.5
+    d = (x - fe) / (n1 * k0)
+
+    lat = phi1 - (n1 * tan1 / r1) * (
+        d ** 2 / 2
+        - (5 + 3 * t1 + 10 * c1 - 4 * c1 ** 2 - 9 * ep2) * d ** 4 / 24
+        + (61 + 90 * t1 + 298 * c1 + 45 * t1 ** 2 - 252 * ep2 - 3 * c1 ** 2) * d ** 6 / 720)
+    lon = np.radians(lon0) + (
+        d
+        - (1 + 2 * t1 + c1) * d ** 3 / 6
+        + (5 - 2 * c1 + 28 * t1 - 3 * c1 ** 2 + 8 * ep2 + 24 * t1 ** 2) * d ** 5 / 120) / cos1
+    return lat, lon
+
+
+def geodetic_to_ecef(lat, lon, a, f):
+    e2 = f * (2 - f)
+    n = a / np.sqrt(1 - e2 * np.sin(lat) ** 2)
+    return (n * np.cos(lat) * np.cos(lon),
+            n * np.cos(lat) * np.sin(lon),
+            n * (1 - e2) * np.sin(lat))
+
+
+def ecef_to_geodetic(x, y, z, a, f, iterations=4):
+    e2 = f * (2 - f)
+    p = np.hypot(x, y)
+    lat = np.arctan2(z, p * (1 - e2))
+    for _ in range(iterations):
+        n = a / np.sqrt(1 - e2 * np.sin(lat) ** 2)
+        lat = np.arctan2(z + e2 * n * np.sin(lat), p)
+    return lat, np.arctan2(y, x)
+
+
+def helmert(x, y, z, params):
+    """7-파라미터 변환 (position vector 규약, proj의 +towgs84와 동일)."""
+    tx, ty, tz, rx, ry, rz, ds = params
+    rx, ry, rz = np.radians(np.array([rx, ry, rz]) / 3600.0)
+    s = 1 + ds * 1e-6
+    return (tx + s * (x - rz * y + ry * z),
+            ty + s * (rz * x + y - rx * z),
+            tz + s * (-ry * x + rx * y + z))
+
+
+def tm128_to_wgs84(x, y):
+    """KATEC(TM128) 미터 좌표 배열 -> WGS84 (lat, lng) 도 단위 배열."""
+    lat_b, lon_b = tm_inverse(np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64),
+                              BESSEL_A, BESSEL_F, TM128_LAT0, TM128_LON0, TM128_K0, TM128_FE, TM128_FN)
+    ex, ey, ez = helmert(*geodetic_to_ecef(lat_b, lon_b, BESSEL_A, BESSEL_F), TM128_TOWGS84)
+    lat, lon = ecef_to_geodetic(ex, ey, ez, WGS84_A, WGS84_F)
+    return np.degrees(lat), np.degrees(lon)
+
+
+@register_decoder("naver")
+def decode_naver(items):
+    x, y = column(items, "mapx"), column(items, "mapy")
+    lat, lng = y / 1e7, x / 1e7
+    legacy = x < NAVER_WGS84_MIN_X  # 구 응답: TM128
+    if legacy.any():
+        t_lat, t_lng = tm128_to_wgs84(x[legacy], y[legacy])
+        lat[legacy], lng[legacy] = t_lat, t_lng
+    return lat, lng
+
+
+@register_decoder("naver_tm128")
+def decode_naver_tm128(items):
+    return tm128_to_wgs84(column(items, "mapx"), column(items, "mapy"))
+
+
+@register_decoder("kakao")
+def decode_kakao(items):
+    return column(items, "y"), column(items, "x")
+
+
+def decode_batch(provider: str, items: list[dict], bounds=KOREA_BOUNDS):
+    """
+    응답 items 전체를 WGS84로 변환합니다.
+    반환: (lat, lng, valid) — valid는 NaN이 아니고 bounds 안에 있는 항목.
+    """
+    if not items:
+        empty = np.empty(0)
+        return empty, empty, np.empty(0, dtype=bool)
+    lat, lng = _DECODERS[provider](items)
+    lat_min, lat_max, lng_min, lng_max = bounds
+    with np.errstate(invalid="ignore"):
+        valid = (lat >= lat_min) & (lat <= lat_max) & (lng >= lng_min) & (lng <= lng_max)
+    return lat, lng, valid
+
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    """기준점 하나와 좌표 배열 사이의 거리 (km)."""
+    lat1, lng1 = np.radians(lat1), np.radians(lng1)
+    lat2, lng2 = np.radians(np.asarray(lat2, dtype=np.float64)), np.radians(np.asarray(lng2, dtype=np.float64))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2
+    return 6371 * 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
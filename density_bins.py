@@ -0,0 +1,181 @@
+import hashlib
+import math
+from collections import OrderedDict
+
+import numpy as np
+
+# =========================================================
+# 밀집 POI 집계 (육각형 / 사각형 격자, Web Mercator 기준)
+# =========================================================
+# 점이 수천 개일 때 마커 대신 격자 셀 하나당 (개수, 평균 평점)만 그립니다.
+# 격자는 Mercator 원점에 고정되어 있어 지도를 이동(panning)해도 셀이 바뀌지 않으므로
+# 결과는 (데이터셋 해시, 줌, 격자 종류)별로 캐시합니다.
+
+EARTH_RADIUS_M = 6378137.0
+METERS_PER_PIXEL_Z0 = 2 * math.pi * EARTH_RADIUS_M / 256  # 줌 0에서 픽셀당 Mercator 미터
+CELL_PX = 48                # 화면상 셀 크기 (픽셀)
+DENSITY_MIN_POINTS = 300    # 이 개수 이상이면 마커 대신 밀집도 레이어로 그림
+SQRT3 = math.sqrt(3)
+
+
+def kakao_level_to_zoom(level: int) -> int:
+    """카카오맵 level(작을수록 확대)을 타일 줌(클수록 확대)으로 근사 변환."""
+    return 20 - level
+
+
+def to_mercator(lat, lng):
+    lat = np.clip(np.asarray(lat, dtype=np.float64), -85.05112878, 85.05112878)
+    x = EARTH_RADIUS_M * np.radians(np.asarray(lng, dtype=np.float64))
+    y = EARTH_RADIUS_M * np.log(np.tan(np.pi / 4 + np.radians(lat) / 2))
+    return x, y
+
+
+def from_mercator(x, y):
+    lng = np.degrees(np.asarray(x) / EARTH_RADIUS_M)
+    lat = np.degrees(2 * np.arctan(np.exp(np.asarray(y) / EARTH_RADIUS_M)) - np.pi / 2)
+    return lat, lng
+
+
+def cell_size_m(zoom: float) -> float:
+    return CELL_PX * METERS_PER_PIXEL_Z0 / (2 ** zoom)
+
+
+def _hex_cells(x, y, size):
+    """pointy-top 육각형의 axial 좌표 (q, r) — cube rounding 벡터화."""
+    qf = (SQRT3 / 3 * x - y / 3) / size
+    rf = (2 / 3 * y) / size
+    sf = -qf - rf
+    q, r, s = np.round(qf), np.round(rf), np.round(sf)
+    dq, dr, ds = np.abs(q - qf), np.abs(r - rf), np.abs(s - sf)
+    fix_q = (dq > dr) & (dq > ds)
+    fix_r = ~fix_q & (dr > ds)
+    q = np.where(fix_q, -r - s, q)
+    r = np.where(fix_r, -q - s, r)
+    return q.astype(np.int64), r.astype(np.int64)
+
+
+def _hex_center(q, r, size):
+    return size * SQRT3 * (q + r / 2), size * 1.5 * r
+
+
+def _hex_ring(cx, cy, size):
+    angles = np.radians(30 + 60 * np.arange(7))  # 닫힌 링 (첫 점 반복)
+    return cx[:, None] + size * np.cos(angles), cy[:, None] + size * np.sin(angles)
+
+
+def _square_ring(cx, cy, size):
+    h = size / 2
+    dx = np.array([-h, h, h, -h, -h])
+    dy = np.array([-h, -h, h, h, -h])
+    return cx[:, None] + dx, cy[:, None] + dy
+
+
+def aggregate(lat, lng, zoom: float, rating=None, kind: str = "hex") -> dict:
+    """
+    점들을 격자 셀로 집계합니다.
+    반환: 셀별 center_lat/center_lng/count/mean_rating(평점 없으면 NaN)/intensity(0~1) 및 ring 좌표 배열.
+    """
+    x, y = to_mercator(lat, lng)
+    size = cell_size_m(zoom)
+
+    if kind == "hex":
+        size = size / SQRT3  # 육각형 폭 == 셀 크기가 되도록 외접원 반지름 환산
+        a, b = _hex_cells(x, y, size)
+    elif kind == "square":
+        a, b = np.floor(x / size).astype(np.int64), np.floor(y / size).astype(np.int64)
+    else:
+        raise ValueError(f"unknown grid kind: {kind}")
+
+    if a.size == 0:
+        empty = np.empty(0)
+        return {"center_lat": empty, "center_lng": empty, "count": empty.astype(np.int64),
+                "mean_rating": empty, "intensity": empty, "ring_lat": empty, "ring_lng": empty}
+
+    keys, inverse, counts = np.unique(np.stack([a, b], axis=1), axis=0, return_inverse=True, return_counts=True)
+    inverse = inverse.reshape(-1)
+
+    if rating is not None:
+        rating = np.asarray(rating, dtype=np.float64)
+        valid = ~np.isnan(rating)
+        sums = np.bincount(inverse, weights=np.where(valid, rating, 0.0), minlength=len(keys))
+        n = np.bincount(inverse, weights=valid.astype(np.float64), minlength=len(keys))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean_rating = np.where(n > 0, sums / n, np.nan)
+    else:
+        mean_rating = np.full(len(keys), np.nan)
+
+    if kind == "hex":
+        cx, cy = _hex_center(keys[:, 0], keys[:, 1], size)
+        rx, ry = _hex_ring(cx, cy, size)
+    else:
+        cx, cy = (keys[:, 0] + 0.5) * size, (keys[:, 1] + 0.5) * size
+        rx, ry = _square_ring(cx, cy, size)
+
+    center_lat, center_lng = from_mercator(cx, cy)
+    ring_lat, ring_lng = from_mercator(rx, ry)
+    return {
+        "center_lat": center_lat,
+        "center_lng": center_lng,
+        "count": counts,
+        "mean_rating": mean_rating,
+        "intensity": counts / counts.max(),
+        "ring_lat": ring_lat,
+        "ring_lng": ring_lng,
+    }
+
+
+def to_geojson(cells: dict) -> dict:
+    """folium.GeoJson / 카카오·네이버 Polygon 렌더링용 FeatureCollection."""
+    features = []
+    for i in range(len(cells["count"])):
+        rating = cells["mean_rating"][i]
+        features.append({
+            "type": "Feature",
+            "geometry": {
+                "type": "Polygon",
+                "coordinates": [[[round(float(g), 6), round(float(t), 6)]
+                                 for t, g in zip(cells["ring_lat"][i], cells["ring_lng"][i])]],
+            },
+            "properties": {
+                "count": int(cells["count"][i]),
+                "mean_rating": None if np.isnan(rating) else round(float(rating), 2),
+                "intensity": round(float(cells["intensity"][i]), 4),
+            },
+        })
+    return {"type": "FeatureCollection", "features": features}
+
+
+def dataset_hash(lat, lng, rating=None) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    for arr in (lat, lng, rating):
+        if arr is not None:
+            h.update(np.ascontiguousarray(arr, dtype=np.float64).tobytes())
+    return h.hexdigest()
+
+
+class DensityBinner:
+    """(데이터셋 해시, 줌, 격자 종류) 단위 LRU 캐시를 가진 집계기."""
+
+    def __init__(self, max_entries: int = 64):
+        self.max_entries = max_entries
+        self._cache = OrderedDict()
+
+    def geojson(self, points: list[dict], zoom: float, kind: str = "hex") -> dict:
+        """lat/lng(선택: rating) 키를 가진 dict 목록을 집계해 GeoJSON으로 돌려줍니다."""
+        lat = np.fromiter((p["lat"] for p in points), dtype=np.float64, count=len(points))
+        lng = np.fromiter((p["lng"] for p in points), dtype=np.float64, count=len(points))
+        rating = np.fromiter(
+            (np.nan if p.get("rating") is None else p["rating"] for p in points),
+            dtype=np.float64, count=len(points),
+        )
+        key = (dataset_hash(lat, lng, rating), int(round(zoom)), kind)
+        hit = self._cache.get(key)
+        if hit is not None:
+            self._cache.move_to_end(key)
+            return hit
+
+        hit = to_geojson(aggregate(lat, lng, key[1], rating, kind))
+        self._cache[key] = hit
+        if len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+        return hit
@@ -0,0 +1,280 @@
+"""
+대량 장소명 → 좌표 변환 배치 CLI (Streamlit 없이 실행).
+
+검색 로직은 네이버 페이지의 search_places와 동일합니다 (로컬 카탈로그 우선 → 네이버 API).
+
+    python geosearch_batch.py pois.csv results.jsonl --column name --concurrency 4 --rate 8
+    python geosearch_batch.py pois.jsonl results.parquet --resume
+
+- 입력: CSV(--column 열) 또는 JSONL(--column 키 / 문자열 한 줄)을 한 줄씩 스트리밍
+- 동시 실행 수(--concurrency)와 초당 요청 수(--rate)를 제한
+- 결과는 --batch-size 단위로 JSONL에 추가하거나 Parquet part 파일로 저장
+- 저장이 끝난 성공 행 번호만 체크포인트에 기록하므로 --resume 시 실패 행부터 이어서 실행
+  (최소 1회 처리 보장: 같은 row가 두 번 기록될 수 있으니 row 기준으로 중복 제거)
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from dotenv import load_dotenv
+
+from catalog_fr import CITY_DATA
+from naver_search import search_places
+from place_search import LocalSearchIndex, catalog_documents
+from resilient_search import ResilientSearch
+
+
+# =========================================================
+# 1) Input streaming
+# =========================================================
+def check_column(path: str, column: str):
+    """
+    --column이 CSV 헤더 / 첫 JSON 객체에 있는지 확인하고, 없으면 종료합니다.
+    (오타가 나면 모든 검색어가 빈 값이 되어 조용히 "empty" 행만 쌓이므로)
+    """
+    with open(path, encoding="utf-8", newline="") as f:
+        if path.endswith(".jsonl"):
+            for line in f:
+                try:
+                    obj = json.loads(line)
+                except json.JSONDecodeError:
+                    continue   # 빈 줄/깨진 줄은 건너뛰고 첫 번째로 읽히는 줄로 판단
+                if isinstance(obj, dict) and column not in obj:
+                    sys.exit(f"--column '{column}' 키가 첫 JSON 객체에 없습니다 (키: {', '.join(obj) or '-'})")
+                return
+        else:
+            header = csv.DictReader(f).fieldnames or []
+            if column not in header:
+                sys.exit(f"--column '{column}' 열이 CSV 헤더에 없습니다 (열: {', '.join(header) or '-'})")
+
+
+def iter_queries(path: str, column: str):
+    """
+    (행 번호, 검색어, 입력 오류)를 입력 파일 순서대로 돌려줍니다.
+    JSONL에서 읽을 수 없는 줄은 실행을 멈추지 않고 (행 번호, 원문, 오류 메시지)로 넘깁니다.
+    """
+    with open(path, encoding="utf-8", newline="") as f:
+        if path.endswith(".jsonl"):
+            for row, line in enumerate(f):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    obj = json.loads(line)
+                except json.JSONDecodeError as e:
+                    yield row, line, f"JSON 형식 오류: {e}"
+                    continue
+                query = obj.get(column) if isinstance(obj, dict) else obj
+                yield row, ("" if query is None else str(query)).strip(), None
+        else:
+            for row, rec in enumerate(csv.DictReader(f)):
+                yield row, (rec.get(column) or "").strip(), None
+
+
+# =========================================================
+# 2) Rate limiting (token bucket)
+# =========================================================
+class RateLimiter:
+    """스레드 간 공유되는 초당 요청 수 제한."""
+
+    def __init__(self, rate_per_sec: float):
+        self.interval = 1.0 / rate_per_sec if rate_per_sec > 0 else 0.0
+        self.next_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        if not self.interval:
+            return
+        with self.lock:
+            now = time.monotonic()
+            wait_for = self.next_at - now
+            self.next_at = max(self.next_at, now) + self.interval
+        if wait_for > 0:
+            time.sleep(wait_for)
+
+
+# =========================================================
+# 3) Checkpoint + output sinks
+# =========================================================
+def load_checkpoint(path: str) -> set:
+    if not os.path.exists(path):
+        return set()
+    with open(path, encoding="utf-8") as f:
+        return {int(line) for line in f if line.strip()}
+
+
+class JsonlSink:
+    def __init__(self, path: str):
+        self.f = open(path, "a", encoding="utf-8")
+
+    def write(self, rows: list[dict]):
+        for r in rows:
+            self.f.write(json.dumps(r, ensure_ascii=False) + "\n")
+        self.f.flush()
+        os.fsync(self.f.fileno())
+
+    def close(self):
+        self.f.close()
+
+
+class ParquetSink:
+    """배치마다 <output>/part-NNNNN.parquet 파일을 하나씩 씁니다 (재시작 시 번호 이어서)."""
+
+    def __init__(self, path: str):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            sys.exit("Parquet 출력에는 pyarrow가 필요합니다: pip install pyarrow")
+        self.pa, self.pq = pa, pq
+        self.dir = path
+        os.makedirs(path, exist_ok=True)
+        self.part = len([n for n in os.listdir(path) if n.startswith("part-")])
+        place = pa.struct([
+            ("title", pa.string()), ("address", pa.string()), ("category", pa.string()),
+            ("lat", pa.float64()), ("lng", pa.float64()), ("distance", pa.float64()),
+        ])
+        self.schema = pa.schema([
+            ("row", pa.int64()), ("query", pa.string()), ("status", pa.string()),
+            ("error", pa.string()), ("results", pa.list_(place)),
+        ])
+
+    def write(self, rows: list[dict]):
+        table = self.pa.Table.from_pylist(rows, schema=self.schema)
+        self.pq.write_table(table, os.path.join(self.dir, f"part-{self.part:05d}.parquet"))
+        self.part += 1
+
+    def close(self):
+        pass
+
+
+# =========================================================
+# 4) Worker
+# =========================================================
+def resolve(row, query, args, local_index, client_id, client_secret, fetcher):
+    out = {"row": row, "query": query, "status": "ok", "error": None, "results": []}
+    if not query:
+        out["status"] = "empty"
+        return out
+
+    # 초당 요청 수 제한은 fetcher(ResilientSearch)의 원격 요청마다 적용 (hedge/폴백 포함, 로컬 검색 제외)
+    for attempt in range(args.retries + 1):
+        remote_errors = []
+        try:
+            # 원격 검색 실패는 on_error로 받아 이미 찾은 로컬 결과를 살림
+            places = search_places(query, client_id, client_secret, args.lat, args.lng,
+                                   local_index=local_index, on_error=remote_errors.append, fetcher=fetcher)
+        except Exception as e:
+            remote_errors, places = [e], []
+
+        if places or not remote_errors:
+            out["results"] = [
+                {k: p.get(k) for k in ("title", "address", "category", "lat", "lng", "distance")}
+                for p in places[:args.top]
+            ]
+            # 로컬 결과만으로 응답한 경우: 행은 ok, 원격 오류는 error에 기록 (재개 시 다시 시도하지 않음)
+            out["status"] = "ok"
+            out["error"] = str(remote_errors[0]) if remote_errors else None
+            return out
+
+        out["status"], out["error"] = "error", str(remote_errors[0])
+        if attempt < args.retries:
+            time.sleep(min(2 ** attempt, 30))
+    return out
+
+
+def run(args):
+    load_dotenv()
+    client_id = os.getenv("NAVER_CLIENT_ID")
+    client_secret = os.getenv("NAVER_CLIENT_SECRET")
+    if not client_id:
+        sys.exit("⚠️ .env 파일에 NAVER_CLIENT_ID를 설정해주세요!")
+
+    checkpoint_path = args.checkpoint or args.output + ".ckpt"
+    if not args.resume and (os.path.exists(args.output) or os.path.exists(checkpoint_path)):
+        sys.exit(f"{args.output} 또는 체크포인트가 이미 있습니다. --resume으로 이어서 실행하거나 먼저 삭제하세요.")
+    done = load_checkpoint(checkpoint_path)
+    check_column(args.input, args.column)
+
+    sink = ParquetSink(args.output) if args.output.endswith(".parquet") else JsonlSink(args.output)
+    local_index = None if args.no_local else LocalSearchIndex(catalog_documents(CITY_DATA))
+    limiter = RateLimiter(args.rate)
+    fetcher = ResilientSearch.from_keys(client_id, client_secret, os.getenv("KAKAO_REST_API_KEY"),
+                                        max_workers=args.concurrency * 2, limiter=limiter).fetch
+
+    pending_rows = []
+    processed = errors = 0
+    started = time.monotonic()
+
+    def flush():
+        nonlocal pending_rows
+        if not pending_rows:
+            return
+        sink.write(pending_rows)
+        with open(checkpoint_path, "a", encoding="utf-8") as ck:
+            ck.write("".join(f"{r['row']}\n" for r in pending_rows if r["status"] != "error"))
+            ck.flush()
+            os.fsync(ck.fileno())
+        pending_rows = []
+
+    def collect(rows):
+        nonlocal processed, errors
+        for r in rows:
+            pending_rows.append(r)
+            processed += 1
+            errors += r["status"] == "error"
+        if len(pending_rows) >= args.batch_size:
+            flush()
+            rate = processed / max(time.monotonic() - started, 1e-9)
+            print(f"{processed} done ({errors} errors, {rate:.1f}/s)", file=sys.stderr)
+
+    # 진행 중인 작업 수를 concurrency * 2로 제한해 입력 전체를 메모리에 올리지 않음
+    in_flight = set()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        try:
+            for row, query, input_error in iter_queries(args.input, args.column):
+                if row in done:
+                    continue
+                if input_error:
+                    # 읽을 수 없는 입력 줄은 검색 없이 오류 행으로 기록 (체크포인트에 남지 않으므로 --resume 시 다시 확인)
+                    collect([{"row": row, "query": query, "status": "error", "error": input_error, "results": []}])
+                    continue
+                if len(in_flight) >= args.concurrency * 2:
+                    finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    collect(f.result() for f in finished)
+                in_flight.add(pool.submit(resolve, row, query, args,
+                                          local_index, client_id, client_secret, fetcher))
+            finished, _ = wait(in_flight)
+            collect(f.result() for f in finished)
+        finally:
+            flush()
+            sink.close()
+
+    print(f"✅ {processed} queries resolved ({errors} errors) -> {args.output}", file=sys.stderr)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="장소명 목록을 좌표로 일괄 변환합니다.")
+    ap.add_argument("input", help="CSV 또는 JSONL 입력 파일")
+    ap.add_argument("output", help="결과 파일 (.jsonl 또는 .parquet 디렉터리)")
+    ap.add_argument("--column", default="query", help="검색어 열/키 이름 (기본: query)")
+    ap.add_argument("--concurrency", type=int, default=4, help="동시 요청 수")
+    ap.add_argument("--rate", type=float, default=8.0, help="초당 최대 요청 수 (0 = 제한 없음)")
+    ap.add_argument("--retries", type=int, default=2, help="실패 시 재시도 횟수")
+    ap.add_argument("--batch-size", type=int, default=100, help="저장/체크포인트 단위")
+    ap.add_argument("--top", type=int, default=1, help="검색어당 저장할 결과 수")
+    ap.add_argument("--lat", type=float, default=None, help="거리순 정렬 기준 위도")
+    ap.add_argument("--lng", type=float, default=None, help="거리순 정렬 기준 경도")
+    ap.add_argument("--checkpoint", default=None, help="체크포인트 파일 (기본: <output>.ckpt)")
+    ap.add_argument("--resume", action="store_true", help="체크포인트 이후부터 이어서 실행")
+    ap.add_argument("--no-local", action="store_true", help="로컬 카탈로그 검색 생략")
+    run(ap.parse_args(argv))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+import json
+import threading
+from collections import OrderedDict
+
+from density_bins import DENSITY_MIN_POINTS, DensityBinner, kakao_level_to_zoom
+from place_filter import PlaceFilterIndex
+
+# =========================================================
+# kakao_mapFR 지도 페이로드 번들 (조합별 지연 생성 + LRU)
+# =========================================================
+# 사이드바 조합 (도시, 일정, 지역 필터, 최소 평점, 레스토랑 표시) 하나당
+# 일정 요약 / 레스토랑 목록 / 지도 JSON 문자열을 처음 요청될 때 한 번 만들고 재사용합니다.
+#   - 전체 조합을 미리 만들지 않으므로 첫 화면 비용이 카탈로그 크기에 비례해 늘지 않음
+#   - JSON은 페이지에 그대로 넣는 문자열로 보관 (프로세스 밖으로 나가지 않으므로 압축하지 않음)
+#   - 카탈로그 핫 리로드 시에는 영향받는 조합만 버림
+
+BUNDLE_CACHE_ENTRIES = 256
+
+PLACE_TYPE_CODES = {"Spot": 0, "Resto": 1}
+
+# 밀집도 레이어는 초기 level 기준 이 범위의 카카오맵 level마다 미리 집계해 두고,
+# 지도 JS가 zoom_changed 때 현재 level(범위 밖이면 가장 가까운 level)의 셀로 교체합니다.
+DENSITY_LEVEL_SPAN = (-4, 2)
+KAKAO_MIN_LEVEL, KAKAO_MAX_LEVEL = 1, 14
+
+
+def bundle_key(city_key: str, route_name: str, area_filter: str, min_rating: float, show_restaurants: bool) -> tuple:
+    return (city_key, route_name, area_filter, round(float(min_rating), 1), bool(show_restaurants))
+
+
+def density_levels(map_level: int) -> range:
+    lo, hi = DENSITY_LEVEL_SPAN
+    return range(max(KAKAO_MIN_LEVEL, map_level + lo), min(KAKAO_MAX_LEVEL, map_level + hi) + 1)
+
+
+def place_detail(p: dict) -> dict:
+    """호버 InfoWindow에 필요한 필드만 추립니다 (메뉴는 최대 3개)."""
+    return {
+        "name": p["name"],
+        "area": p["area"],
+        "desc_fr": p["desc_fr"],
+        "price_krw": p.get("price_krw", 0),
+        "rating": p.get("rating"),
+        "menu": [[m["name"], m["price_krw"]] for m in p.get("menu", [])[:3]],
+    }
+
+
+class MapBundleCache:
+    """
+    도시별 필터 인덱스 + 밀집도 집계기 + 조합별 번들 LRU.
+    city_data / city_routes는 catalog_fr.CITY_DATA / CITY_ROUTES (핫 리로드 시 제자리에서 갱신됨).
+    """
+
+    def __init__(self, city_data: dict, city_routes: dict, spot_by_name, max_entries: int = BUNDLE_CACHE_ENTRIES):
+        self.city_data = city_data
+        self.city_routes = city_routes
+        self.spot_by_name = spot_by_name
+        self.max_entries = max_entries
+        self.binner = DensityBinner()
+        self.indexes = {}
+        self._bundles = OrderedDict()
+        self.generation = 0   # 카탈로그 변경마다 증가 (변경 전에 만든 번들은 캐시에 넣지 않음)
+        self.lock = threading.RLock()
+
+    def filter_index(self, city_key: str) -> PlaceFilterIndex:
+        """도시별 스팟 + 레스토랑 필터 인덱스 (처음 필요할 때 생성)."""
+        with self.lock:
+            index = self.indexes.get(city_key)
+            if index is None:
+                city = self.city_data[city_key]
+                index = self.indexes[city_key] = PlaceFilterIndex(city["spots"] + city["restos"])
+            return index
+
+    def get(self, city_key: str, route_name: str, area_filter: str, min_rating: float, show_restaurants: bool) -> dict:
+        key = bundle_key(city_key, route_name, area_filter, min_rating, show_restaurants)
+        with self.lock:
+            bundle = self._bundles.get(key)
+            if bundle is not None:
+                self._bundles.move_to_end(key)
+                return bundle
+            generation = self.generation
+
+        bundle = self.build(*key)
+        with self.lock:
+            if generation == self.generation:
+                self._bundles[key] = bundle
+                while len(self._bundles) > self.max_entries:
+                    self._bundles.popitem(last=False)
+        return bundle
+
+    def build(self, city_key: str, route_name: str, area_filter: str, min_rating: float, show_restaurants: bool) -> dict:
+        """
+        조합 하나에 대한 일정 요약, 레스토랑 목록, 지도 JSON 문자열을 계산합니다.
+        EUR 표시는 환율에 따라 바뀌므로 렌더링 시점에 변환합니다.
+        """
+        city_data = self.city_data[city_key]
+        route_days = self.city_routes[city_key][route_name]
+
+        summary = []
+        for d in route_days:
+            day_spots = [sp for sp in (self.spot_by_name(city_key, nm) for nm in d["spots"]) if sp]
+            summary.append({"day": d["day"], "spots": day_spots})
+
+        # 목록과 지도가 같은 필터 결과를 공유
+        restos = self.filter_index(city_key).select(
+            area=None if area_filter == "Tous" else area_filter,
+            min_rating=round(float(min_rating), 1),
+            place_type="Resto",
+        )
+
+        route_spot_names = {nm for d in route_days for nm in d["spots"]}
+        route_spots = [s for s in city_data["spots"] if s["name"] in route_spot_names]
+
+        # pack for JS : 좌표/타입/id 병렬 배열 + id별 상세 정보(호버 시 사용)
+        # 레스토랑이 많으면 개별 마커 대신 육각형 밀집도 레이어(개수/평균 평점, level별)로 보냄
+        shown_restos = restos if show_restaurants else []
+        cells = None
+        if len(shown_restos) >= DENSITY_MIN_POINTS:
+            cells = {
+                level: self.binner.geojson(shown_restos, kakao_level_to_zoom(level))
+                for level in density_levels(city_data["map_level"])
+            }
+            shown_restos = []
+
+        placed = route_spots + shown_restos
+        map_items = {
+            "id": [p["id"] for p in placed],
+            "lat": [p["lat"] for p in placed],
+            "lng": [p["lng"] for p in placed],
+            "type": [PLACE_TYPE_CODES[p["type"]] for p in placed],
+            "cells": cells,
+        }
+        details = {p["id"]: place_detail(p) for p in placed}
+
+        return {
+            "summary": summary,
+            "restos": restos,
+            "map_items_json": json.dumps(map_items, separators=(",", ":")),
+            # <script> 안에 넣는 JSON이므로 "</" 시퀀스를 이스케이프
+            "details_json": json.dumps(details, ensure_ascii=False, separators=(",", ":")).replace("</", "<\\/"),
+        }
+
+    def affected(self, key: tuple, change) -> bool:
+        """카탈로그 변경이 이 조합의 일정 요약 / 레스토랑 목록 / 지도 페이로드에 영향을 주는지."""
+        city_key, route_name, area_filter, min_rating, _show = key
+        if city_key in change.cities or city_key in change.reordered or route_name in change.routes.get(city_key, ()):
+            return True
+        route_spot_names = None
+        for c, kind, old, new in change.records:
+            if c != city_key:
+                continue
+            for p in (old, new):
+                if p is None:
+                    continue
+                if kind == "spots":
+                    if route_spot_names is None:
+                        route_days = self.city_routes.get(city_key, {}).get(route_name, [])
+                        route_spot_names = {nm for d in route_days for nm in d["spots"]}
+                    if p["name"] in route_spot_names:
+                        return True
+                elif area_filter in ("Tous", p["area"]) and (p.get("rating") or 0) >= min_rating:
+                    return True
+        return False
+
+    def apply_catalog_change(self, change):
+        """
+        catalog_fr 구독자: 바뀐 레코드만 필터 인덱스에 반영하고 영향받는 번들만 버립니다.
+        레코드 순서가 바뀐 도시는 필터 인덱스를 파일 순서로 다시 만들고 그 도시의 번들을 모두 버립니다.
+        나머지 번들과 밀집도 캐시(데이터셋 해시 키)는 그대로 재사용됩니다.
+        """
+        with self.lock:
+            self.generation += 1
+            for city_key in change.cities:
+                if city_key not in self.city_data:
+                    self.indexes.pop(city_key, None)
+            for city_key in change.reordered:
+                index = self.indexes.get(city_key)
+                if index is not None:
+                    index.rebuild(self.city_data[city_key]["spots"] + self.city_data[city_key]["restos"])
+            for city_key, _kind, old, new in change.records:
+                index = self.indexes.get(city_key)
+                if index is None or city_key in change.reordered:
+                    continue   # 아직 만들지 않은 인덱스는 다음에 최신 카탈로그로 생성됨
+                if new is None:
+                    index.remove(old["id"])
+                else:
+                    index.upsert(new)
+
+            for key in [k for k in self._bundles if self.affected(k, change)]:
+                del self._bundles[key]
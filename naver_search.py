@@ -0,0 +1,93 @@
+import numpy as np
+import requests
+
+from coords import decode_batch, haversine_km
+from place_search import local_search_results
+
+# =========================================================
+# 네이버 지역 검색 (Streamlit 비의존)
+# =========================================================
+# app_naver.py / naver_maps.py 페이지와 geosearch_batch.py 배치 CLI가 같은 검색 로직을 공유합니다.
+
+NAVER_LOCAL_URL = "https://openapi.naver.com/v1/search/local.json"
+LOCAL_MIN_HITS = 3  # 로컬 카탈로그 결과가 이보다 적을 때만 네이버 API 호출
+NAVER_TIMEOUT_S = 3.0
+
+
+class NaverSearchError(Exception):
+    """네이버 API가 200이 아닌 응답을 돌려준 경우."""
+
+    def __init__(self, status_code: int):
+        super().__init__(f"검색 API 오류: {status_code}")
+        self.status_code = status_code
+
+
+def fetch_naver_places(query, client_id, client_secret, display=10, timeout=NAVER_TIMEOUT_S):
+    """네이버 지역 검색 API 호출. 200이 아니면 NaverSearchError를 던집니다."""
+    headers = {
+        "X-Naver-Client-Id": client_id,
+        "X-Naver-Client-Secret": client_secret
+    }
+    params = {
+        "query": query,
+        "display": display,
+        "sort": "random"
+    }
+
+    response = requests.get(NAVER_LOCAL_URL, headers=headers, params=params, timeout=timeout)
+    if response.status_code != 200:
+        raise NaverSearchError(response.status_code)
+
+    items = response.json().get("items", [])
+    lat, lng, valid = decode_batch("naver", items)
+
+    results = []
+    for i in np.flatnonzero(valid):
+        item = items[i]
+        results.append({
+            "title": item.get("title", "").replace("<b>", "").replace("</b>", ""),
+            "address": item.get("roadAddress", "") or item.get("address", ""),
+            "category": item.get("category", ""),
+            "lat": float(lat[i]),
+            "lng": float(lng[i])
+        })
+    return results
+
+
+def search_places(query, client_id, client_secret, user_lat=None, user_lng=None,
+                  local_index=None, on_error=None, fetcher=None):
+    """
+    로컬 카탈로그 우선 → 부족하면 원격 검색, 위치가 있으면 거리순 정렬.
+    fetcher(query, lat, lng)를 주면 네이버 API 직접 호출 대신 사용합니다 (예: ResilientSearch.fetch).
+    on_error가 주어지면 API 예외를 넘겨주고 로컬 결과만 돌려주며, 없으면 예외를 그대로 던집니다.
+    """
+    if not query:
+        return []
+
+    results = []
+    if local_index is not None:
+        results = local_search_results(local_index, query)
+
+    if len(results) < LOCAL_MIN_HITS:
+        try:
+            if fetcher is not None:
+                results += fetcher(query, user_lat, user_lng)
+            else:
+                results += fetch_naver_places(query, client_id, client_secret)
+        except Exception as e:
+            if on_error is None:
+                raise
+            on_error(e)
+
+    distances = [None] * len(results)
+    if user_lat and user_lng and results:
+        distances = haversine_km(user_lat, user_lng,
+                                 [p["lat"] for p in results], [p["lng"] for p in results]).tolist()
+    for place, distance in zip(results, distances):
+        place["distance"] = distance
+
+    # 거리순 정렬 (가까운 순)
+    if user_lat and user_lng:
+        results.sort(key=lambda x: x["distance"] if x["distance"] else float('inf'))
+
+    return results
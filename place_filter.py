@@ -0,0 +1,157 @@
+import threading
+from bisect import bisect_left, bisect_right
+
+# =========================================================
+# 장소(스팟/레스토랑) 다중 속성 필터 인덱스
+# =========================================================
+# 각 속성마다 "해당 장소 집합"을 비트맵(int)으로 미리 만들어 두고,
+# 필터 조합은 비트맵 AND 한 번으로 계산합니다.
+#   - area        -> 비트맵
+#   - type        -> 비트맵
+#   - price bucket-> 비트맵 (레스토랑은 메뉴 최저가, 스팟은 입장료 기준)
+#   - rating      -> 정렬된 평점 컬럼 + 접미(suffix) 비트맵
+# 카탈로그가 바뀌면 upsert()/remove()로 해당 장소의 비트만 고칩니다 (전체 재구성 없음).
+
+# 가격 구간 경계 (KRW): [0, 10000), [10000, 20000), [20000, 30000), [30000, ∞)
+PRICE_BUCKET_BOUNDS_KRW = (10000, 20000, 30000)
+
+
+def entry_price_krw(place: dict) -> int:
+    """스팟은 입장료, 레스토랑은 메뉴 최저가를 대표 가격으로 사용합니다."""
+    menu = place.get("menu") or []
+    if menu:
+        return min(m["price_krw"] for m in menu)
+    return place.get("price_krw", 0)
+
+
+def price_bucket(price_krw: int | float) -> int:
+    return bisect_right(PRICE_BUCKET_BOUNDS_KRW, price_krw)
+
+
+def iter_bits(mask: int):
+    """비트맵에서 켜진 비트의 위치를 오름차순으로 돌려줍니다."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+class PlaceFilterIndex:
+    """
+    카탈로그 순서를 유지하는 다중 속성 필터 인덱스.
+    같은 필터 조합은 한 번만 평가하고 결과를 재사용합니다.
+    장소는 id로 식별하며, 삭제된 슬롯은 비워 두고 새 장소는 끝에 붙입니다.
+    카탈로그 순서 자체가 바뀌면 rebuild()로 다시 만듭니다.
+    """
+
+    def __init__(self, places: list[dict]):
+        self.lock = threading.RLock()
+        self.rebuild(places)
+
+    def rebuild(self, places: list[dict]):
+        with self.lock:
+            self.places = list(places)   # 슬롯 -> 장소 (삭제된 슬롯은 None)
+            self.slot_by_id = {p["id"]: i for i, p in enumerate(self.places)}
+            self._build()
+            self._cache = {}
+
+    def _build(self):
+        self.all_mask = (1 << len(self.places)) - 1
+        self.area_masks = {}
+        self.type_masks = {}
+        self.price_masks = {}
+
+        for i, p in enumerate(self.places):
+            bit = 1 << i
+            self.area_masks[p["area"]] = self.area_masks.get(p["area"], 0) | bit
+            self.type_masks[p["type"]] = self.type_masks.get(p["type"], 0) | bit
+            b = price_bucket(entry_price_krw(p))
+            self.price_masks[b] = self.price_masks.get(b, 0) | bit
+
+        # 평점 오름차순 정렬 + 접미 비트맵: rating_suffix[k] = 정렬 순서 k번째 이후 전체
+        order = sorted(range(len(self.places)), key=lambda i: self.places[i].get("rating") or 0)
+        self.sorted_ratings = [self.places[i].get("rating") or 0 for i in order]
+        self.rating_slots = order
+        self.rating_suffix = [0] * (len(order) + 1)
+        for k in range(len(order) - 1, -1, -1):
+            self.rating_suffix[k] = self.rating_suffix[k + 1] | (1 << order[k])
+
+    def _index(self, slot: int):
+        p = self.places[slot]
+        bit = 1 << slot
+        self.all_mask |= bit
+        self.area_masks[p["area"]] = self.area_masks.get(p["area"], 0) | bit
+        self.type_masks[p["type"]] = self.type_masks.get(p["type"], 0) | bit
+        b = price_bucket(entry_price_krw(p))
+        self.price_masks[b] = self.price_masks.get(b, 0) | bit
+
+        # 정렬 위치 k에 끼워 넣고, k 이전의 접미 비트맵에 비트 추가
+        rating = p.get("rating") or 0
+        k = bisect_right(self.sorted_ratings, rating)
+        self.sorted_ratings.insert(k, rating)
+        self.rating_slots.insert(k, slot)
+        self.rating_suffix.insert(k, self.rating_suffix[k] | bit)
+        for j in range(k):
+            self.rating_suffix[j] |= bit
+
+    def _unindex(self, slot: int):
+        p = self.places[slot]
+        bit = 1 << slot
+        self.all_mask &= ~bit
+        for masks, key in ((self.area_masks, p["area"]), (self.type_masks, p["type"]),
+                           (self.price_masks, price_bucket(entry_price_krw(p)))):
+            masks[key] &= ~bit
+            if not masks[key]:
+                del masks[key]
+
+        k = self.rating_slots.index(slot, bisect_left(self.sorted_ratings, p.get("rating") or 0))
+        del self.sorted_ratings[k], self.rating_slots[k], self.rating_suffix[k]
+        for j in range(k):
+            self.rating_suffix[j] &= ~bit
+
+    def upsert(self, place: dict):
+        """장소 하나를 추가하거나 (같은 id면) 제자리에서 교체합니다."""
+        with self.lock:
+            slot = self.slot_by_id.get(place["id"])
+            if slot is None:
+                slot = len(self.places)
+                self.places.append(None)
+                self.slot_by_id[place["id"]] = slot
+            else:
+                self._unindex(slot)
+            self.places[slot] = place
+            self._index(slot)
+            self._cache = {}
+
+    def remove(self, place_id: str):
+        with self.lock:
+            slot = self.slot_by_id.pop(place_id, None)
+            if slot is None:
+                return
+            self._unindex(slot)
+            self.places[slot] = None
+            self._cache = {}
+
+    def mask(self, area: str | None = None, min_rating: float | None = None,
+             price_bucket: int | None = None, place_type: str | None = None) -> int:
+        m = self.all_mask
+        if area is not None:
+            m &= self.area_masks.get(area, 0)
+        if place_type is not None:
+            m &= self.type_masks.get(place_type, 0)
+        if price_bucket is not None:
+            m &= self.price_masks.get(price_bucket, 0)
+        if min_rating is not None:
+            m &= self.rating_suffix[bisect_left(self.sorted_ratings, min_rating)]
+        return m
+
+    def select(self, area: str | None = None, min_rating: float | None = None,
+               price_bucket: int | None = None, place_type: str | None = None) -> list[dict]:
+        """필터 조합에 맞는 장소 목록 (카탈로그 순서, 조합별 메모이즈)."""
+        key = (area, min_rating, price_bucket, place_type)
+        hit = self._cache.get(key)
+        if hit is None:
+            with self.lock:
+                hit = [self.places[i] for i in iter_bits(self.mask(*key))]
+                self._cache[key] = hit
+        return hit
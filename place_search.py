@@ -0,0 +1,192 @@
+import math
+import re
+import threading
+import unicodedata
+
+# =========================================================
+# 로컬 카탈로그 전문 검색 (한국어 + 프랑스어) : BM25
+# =========================================================
+# - 한글: NFKD로 자모 분해 후 자모 3-gram으로 색인 (부분 음절 입력도 매칭: "카ㅍ" -> "카페")
+# - 프랑스어/영어: 악센트 제거 + 소문자 단어 단위 색인 ("cafés" == "cafes")
+# - 필드 가중치: 이름 > 메뉴 > 지역/설명
+# - 카탈로그 핫 리로드: 바뀐 장소 문서만 upsert()/remove()로 역색인에 반영
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+JAMO_NGRAM = 3
+FIELD_WEIGHTS = {"name": 3, "menu": 2, "area": 1, "desc_fr": 1}
+
+# 질의어 중 이 비율 이상이 문서에 있어야 결과로 인정 (자모 n-gram 부분 겹침 잡음 제거)
+MIN_TERM_COVERAGE = 0.75
+
+FRENCH_STOPWORDS = {
+    "le", "la", "les", "de", "des", "du", "et", "en", "au", "aux", "un", "une",
+    "pour", "sur", "avec", "dans", "par", "tres", "the", "of",
+}
+
+_LIGATURES = str.maketrans({"œ": "oe", "æ": "ae", "ß": "ss"})
+_TOKEN_RE = re.compile(r"[ᄀ-ᇿ]+|[0-9a-z]+")
+
+
+def normalize(text: str) -> str:
+    """소문자화 + NFKD (한글 음절 -> 자모, 호환 자모 -> 조합형 자모) + 결합 악센트 제거."""
+    text = unicodedata.normalize("NFKD", text.lower().translate(_LIGATURES))
+    return "".join(ch for ch in text if not unicodedata.combining(ch))
+
+
+def tokenize(text: str) -> list[str]:
+    terms = []
+    for tok in _TOKEN_RE.findall(normalize(text)):
+        if "ᄀ" <= tok[0] <= "ᇿ":
+            if len(tok) <= JAMO_NGRAM:
+                terms.append(tok)
+            else:
+                terms.extend(tok[i:i + JAMO_NGRAM] for i in range(len(tok) - JAMO_NGRAM + 1))
+        elif len(tok) > 1 and tok not in FRENCH_STOPWORDS:
+            terms.append(tok)
+    return terms
+
+
+def place_document(city_key: str, p: dict) -> dict:
+    return {
+        "city": city_key,
+        "place": p,
+        "fields": {
+            "name": p["name"],
+            "area": p["area"],
+            "desc_fr": p.get("desc_fr", ""),
+            "menu": " ".join(m["name"] for m in p.get("menu", [])),
+        },
+    }
+
+
+def catalog_documents(city_data: dict) -> list[dict]:
+    """CITY_DATA 구조를 검색 문서 목록으로 펼칩니다."""
+    return [
+        place_document(city_key, p)
+        for city_key, city in city_data.items()
+        for p in city["spots"] + city["restos"]
+    ]
+
+
+class LocalSearchIndex:
+    """필드 가중치를 적용한 역색인 + BM25 랭킹. 문서는 (도시, 장소 id)로 식별합니다."""
+
+    def __init__(self, docs: list[dict]):
+        self.docs = []        # doc_idx -> 문서 (삭제된 자리는 None)
+        self.postings = {}    # term -> {doc_idx: weighted tf}
+        self.doc_terms = []   # doc_idx -> {term: weighted tf} (삭제 시 postings 정리용)
+        self.doc_len = []
+        self.slot_by_key = {}
+        self.total_len = 0
+        self.live_docs = 0
+        self.lock = threading.RLock()
+        for doc in docs:
+            self.upsert(doc)
+
+    @staticmethod
+    def doc_key(doc: dict) -> tuple:
+        return (doc["city"], doc["place"]["id"])
+
+    @property
+    def avg_len(self) -> float:
+        return (self.total_len / self.live_docs) if self.live_docs else 0.0
+
+    def upsert(self, doc: dict):
+        """문서를 추가하거나 같은 (도시, id) 문서를 교체합니다."""
+        with self.lock:
+            key = self.doc_key(doc)
+            i = self.slot_by_key.get(key)
+            if i is None:
+                i = len(self.docs)
+                self.docs.append(None)
+                self.doc_terms.append({})
+                self.doc_len.append(0)
+                self.slot_by_key[key] = i
+            else:
+                self._unindex(i)
+
+            terms = {}
+            for field, text in doc["fields"].items():
+                w = FIELD_WEIGHTS.get(field, 1)
+                for term in tokenize(text):
+                    terms[term] = terms.get(term, 0) + w
+            for term, tf in terms.items():
+                self.postings.setdefault(term, {})[i] = tf
+            self.docs[i] = doc
+            self.doc_terms[i] = terms
+            self.doc_len[i] = sum(terms.values())
+            self.total_len += self.doc_len[i]
+            self.live_docs += 1
+
+    def remove(self, city_key: str, place_id: str):
+        with self.lock:
+            i = self.slot_by_key.pop((city_key, place_id), None)
+            if i is not None:
+                self._unindex(i)
+
+    def _unindex(self, i: int):
+        for term in self.doc_terms[i]:
+            posting = self.postings[term]
+            del posting[i]
+            if not posting:
+                del self.postings[term]
+        self.total_len -= self.doc_len[i]
+        self.live_docs -= 1
+        self.docs[i] = None
+        self.doc_terms[i] = {}
+        self.doc_len[i] = 0
+
+    def _idf(self, term: str) -> float:
+        n = self.live_docs
+        df = len(self.postings.get(term, ()))
+        return math.log(1 + (n - df + 0.5) / (df + 0.5))
+
+    def search(self, query: str, limit: int = 10) -> list[tuple[dict, float]]:
+        """(문서, 점수) 목록을 점수 내림차순으로 돌려줍니다."""
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return []
+
+        scores = {}
+        matched = {}
+        with self.lock:
+            avg_len = self.avg_len
+            for term in terms:
+                posting = self.postings.get(term)
+                if not posting:
+                    continue
+                idf = self._idf(term)
+                for i, tf in posting.items():
+                    norm = BM25_K1 * (1 - BM25_B + BM25_B * self.doc_len[i] / avg_len)
+                    scores[i] = scores.get(i, 0.0) + idf * tf * (BM25_K1 + 1) / (tf + norm)
+                    matched[i] = matched.get(i, 0) + 1
+
+            need = MIN_TERM_COVERAGE * len(terms)
+            ranked = sorted((i for i in scores if matched[i] >= need), key=lambda i: -scores[i])
+            return [(self.docs[i], scores[i]) for i in ranked[:limit]]
+
+
+def apply_catalog_change(index: LocalSearchIndex, change) -> None:
+    """catalog_fr.CatalogChange의 바뀐 장소만 검색 인덱스에 반영합니다."""
+    for city_key, _kind, old, new in change.records:
+        if new is None:
+            index.remove(city_key, old["id"])
+        else:
+            index.upsert(place_document(city_key, new))
+
+
+def local_search_results(index: LocalSearchIndex, query: str, limit: int = 10) -> list[dict]:
+    """검색 결과를 네이버 페이지의 search_places 결과 형식으로 변환합니다."""
+    results = []
+    for doc, score in index.search(query, limit=limit):
+        p = doc["place"]
+        results.append({
+            "title": p["name"],
+            "address": f"{p['area']}, {doc['city']}",
+            "category": f"Local · {p['type']}",
+            "lat": p["lat"],
+            "lng": p["lng"],
+            "score": score,
+        })
+    return results
@@ -0,0 +1,179 @@
+import threading
+import time
+from collections import OrderedDict
+
+# =========================================================
+# 위치 기반 예측 프리페치 + 검색 결과 캐시
+# =========================================================
+# 위치가 잡히면 가장 흔한 다음 검색(카페/음식점/편의점)을 백그라운드에서 미리 실행해
+# (검색어, 위치 셀) 캐시를 데워 둡니다. 사용자가 직접 검색하면 캐시에서 바로 응답합니다.
+# 위치를 쓰지 않는 제공자(네이버)의 결과는 셀 없이 (검색어, None)으로 캐시하므로,
+# 셀이 바뀌어도 같은 결과를 다시 받느라 쿼터를 쓰지 않습니다.
+
+PREFETCH_CATEGORIES = ("카페", "음식점", "편의점")
+CELL_SIZE_DEG = 0.01           # 위치 셀 크기 (약 1km)
+CACHE_TTL_S = 600.0
+CACHE_MAX_ENTRIES = 2048
+
+# 프리페치는 API 쿼터의 일부만 사용하는 저우선순위 작업
+PREFETCH_MAX_PER_DAY = 2000
+PREFETCH_MIN_INTERVAL_S = 1.0  # 프리페치 요청 사이 최소 간격
+FOREGROUND_QUIET_S = 1.0       # 사용자 검색 직후에는 프리페치를 잠시 양보
+PREFETCH_MAX_PENDING = 60      # 대기 중인 (검색어, 위치 셀) 작업 상한 (넘치면 오래된 것부터 버림)
+
+
+def location_cell(lat, lng):
+    if not lat or not lng:
+        return None
+    return (round(lat / CELL_SIZE_DEG), round(lng / CELL_SIZE_DEG))
+
+
+class SearchResultCache:
+    """(정규화된 검색어, 위치 셀) -> 원격 검색 결과, TTL + LRU."""
+
+    def __init__(self, ttl: float = CACHE_TTL_S, max_entries: int = CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._items = OrderedDict()
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def key(query, lat, lng):
+        return (" ".join(query.split()).lower(), location_cell(lat, lng))
+
+    def get(self, key):
+        with self.lock:
+            hit = self._items.get(key)
+            if hit is None:
+                return None
+            stored_at, results = hit
+            if time.monotonic() - stored_at > self.ttl:
+                del self._items[key]
+                return None
+            self._items.move_to_end(key)
+            return results
+
+    def put(self, key, results):
+        with self.lock:
+            self._items[key] = (time.monotonic(), results)
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+
+class CachedFetcher:
+    """
+    원격 fetcher(query, lat, lng, prefer_location) -> (결과, 위치 반영 여부)를 캐시로 감쌉니다
+    (예: ResilientSearch.fetch_located). 인스턴스 자체는 naver_search.search_places의 fetcher로
+    그대로 넘길 수 있습니다.
+    """
+
+    def __init__(self, fetcher, cache: SearchResultCache | None = None):
+        self.fetcher = fetcher
+        self.cache = cache or SearchResultCache()
+        self.last_foreground = 0.0
+
+    def __call__(self, query, lat=None, lng=None):
+        self.last_foreground = time.monotonic()
+        return self._fetch(query, lat, lng)
+
+    def _keys(self, query, lat, lng):
+        located = self.cache.key(query, lat, lng)
+        unlocated = self.cache.key(query, None, None)
+        return (located, unlocated) if located != unlocated else (located,)
+
+    def lookup(self, query, lat, lng):
+        """위치 셀 결과 -> 위치 무관 결과 순으로 캐시를 찾습니다."""
+        for key in self._keys(query, lat, lng):
+            hit = self.cache.get(key)
+            if hit is not None:
+                return hit
+        return None
+
+    def _fetch(self, query, lat, lng, prefer_location=False):
+        hit = self.lookup(query, lat, lng)
+        if hit is None:
+            hit, location_used = self.fetcher(query, lat, lng, prefer_location)
+            lat, lng = (lat, lng) if location_used else (None, None)
+            self.cache.put(self.cache.key(query, lat, lng), hit)
+        # search_places가 거리 필드를 덧붙이므로 결과 dict는 복사해서 돌려줌
+        return [dict(p) for p in hit]
+
+    def warm(self, query, lat, lng) -> bool:
+        """프리페치용 (위치를 쓰는 제공자 우선): 이미 캐시에 있으면 False, 새로 가져왔으면 True."""
+        if self.lookup(query, lat, lng) is not None:
+            return False
+        self._fetch(query, lat, lng, prefer_location=True)
+        return True
+
+
+class PrefetchWorker:
+    """
+    위치 셀별 카테고리 검색을 데몬 스레드 하나에서 순차 실행합니다.
+    워커는 모든 세션이 공유하므로 대기 작업은 (검색어, 위치 셀) 단위로 중복 없이 쌓고,
+    상한을 넘으면 가장 오래된 작업부터 버립니다 (다른 사용자의 대기 작업을 덮어쓰지 않음).
+    """
+
+    def __init__(self, fetcher: CachedFetcher, categories=PREFETCH_CATEGORIES,
+                 max_per_day: int = PREFETCH_MAX_PER_DAY, max_pending: int = PREFETCH_MAX_PENDING):
+        self.fetcher = fetcher
+        self.categories = tuple(categories)
+        self.max_per_day = max_per_day
+        self.max_pending = max_pending
+        self.pending = OrderedDict()   # (검색어, 위치 셀) -> (lat, lng), 들어온 순서대로 실행
+        self.running = None            # 지금 실행 중인 (검색어, 위치 셀)
+        self.used_today = 0
+        self.day = time.strftime("%Y-%m-%d")
+        self.cond = threading.Condition()
+        self.thread = threading.Thread(target=self._run, name="search-prefetch", daemon=True)
+        self.thread.start()
+
+    def submit_location(self, lat, lng):
+        cell = location_cell(lat, lng)
+        if cell is None:
+            return
+        with self.cond:
+            for q in self.categories:
+                key = (q, cell)
+                if key in self.pending or key == self.running or self.fetcher.lookup(q, lat, lng) is not None:
+                    continue
+                self.pending[key] = (lat, lng)
+                while len(self.pending) > self.max_pending:
+                    self.pending.popitem(last=False)
+            self.cond.notify()
+
+    def _take_quota(self) -> bool:
+        today = time.strftime("%Y-%m-%d")
+        if today != self.day:
+            self.day, self.used_today = today, 0
+        if self.used_today >= self.max_per_day:
+            return False
+        self.used_today += 1
+        return True
+
+    def _run(self):
+        while True:
+            with self.cond:
+                while not self.pending:
+                    self.cond.wait()
+                self.running, (lat, lng) = self.pending.popitem(last=False)
+                query = self.running[0]
+
+            # 사용자 검색이 진행 중이면 양보
+            quiet = self.fetcher.last_foreground + FOREGROUND_QUIET_S - time.monotonic()
+            if quiet > 0:
+                time.sleep(quiet)
+
+            attempted = self.fetcher.lookup(query, lat, lng) is None and self._take_quota()
+            if attempted:
+                try:
+                    self.fetcher.warm(query, lat, lng)
+                except Exception:
+                    pass  # 프리페치 실패는 무시 (사용자 검색 때 다시 시도)
+            with self.cond:
+                self.running = None
+            if attempted:
+                time.sleep(PREFETCH_MIN_INTERVAL_S)
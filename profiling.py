@@ -0,0 +1,123 @@
+import contextlib
+import cProfile
+import os
+import pstats
+import threading
+import time
+
+import streamlit as st
+
+# =========================================================
+# 리런(rerun) 단위 온디맨드 프로파일러
+# =========================================================
+# ?profile=1 쿼리 파라미터 또는 MAPS_PROFILE=1 환경 변수로 켭니다.
+#   - 페이지 본문을 `with profile_rerun("page"):`로 감싸 cProfile로 측정하고 .prof 파일로 저장
+#     (snakeviz / flameprof / gprof2dot 등 flamegraph 도구로 열 수 있음)
+#   - 예외나 위젯 조작으로 리런이 중단되어도 finally에서 프로파일러를 끄고 파일을 남김
+#   - 정상 종료 시 페이지 하단에 구간별 시간 + 상위 N개 hotspot 표 출력
+#   - cProfile은 프로세스 전역 도구(3.12+)이므로 동시에 한 리런만 측정 (나머지는 건너뜀)
+# 꺼져 있으면 profile_rerun()은 None을 내주고, section()은 공유 nullcontext만 돌려줍니다.
+
+PROFILE_DIR = os.getenv("MAPS_PROFILE_DIR", "profiles")
+TOP_N = 25
+
+_NULL = contextlib.nullcontext()
+_local = threading.local()  # Streamlit은 세션별 스크립트를 각자의 스레드에서 실행
+_active = threading.Lock()  # 동시에 측정 중인 리런은 하나
+
+
+def profiling_enabled() -> bool:
+    if os.getenv("MAPS_PROFILE") == "1":
+        return True
+    return st.query_params.get("profile") == "1"
+
+
+class RerunProfiler:
+    def __init__(self, page: str):
+        self.page = page
+        self.profile = cProfile.Profile()
+        self.sections = []   # (구간 이름, 초)
+        self.started = time.perf_counter()
+
+    @contextlib.contextmanager
+    def section(self, name: str):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.sections.append((name, time.perf_counter() - t0))
+
+    def save(self) -> str:
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        stamp = f"{time.strftime('%Y%m%d-%H%M%S')}.{int(time.time() * 1000) % 1000:03d}"
+        path = os.path.join(PROFILE_DIR, f"{self.page}-{stamp}-{os.getpid()}.prof")
+        self.profile.dump_stats(path)
+        return path
+
+    def hotspots(self, top_n: int = TOP_N) -> list[dict]:
+        stats = pstats.Stats(self.profile)
+        rows = []
+        for (filename, line, func), (cc, nc, tt, ct, _callers) in stats.stats.items():
+            rows.append({
+                "function": func,
+                "location": f"{os.path.basename(filename)}:{line}",
+                "calls": nc,
+                "self (ms)": round(tt * 1000, 2),
+                "cumulative (ms)": round(ct * 1000, 2),
+            })
+        rows.sort(key=lambda r: r["self (ms)"], reverse=True)
+        return rows[:top_n]
+
+
+@contextlib.contextmanager
+def profile_rerun(page: str, top_n: int = TOP_N):
+    """
+    페이지 본문 전체를 감쌉니다. 프로파일링이 꺼져 있거나 다른 리런을 측정 중이면 None을 내줍니다.
+    """
+    if not profiling_enabled():
+        yield None
+        return
+    profiler = RerunProfiler(page)
+    if not _active.acquire(blocking=False):
+        st.caption("⏱️ Profiling skipped: another rerun is being profiled.")
+        yield None
+        return
+    try:
+        profiler.profile.enable()
+    except ValueError:  # 디버거 등 다른 프로파일링 도구가 이미 활성 (3.12+ sys.monitoring)
+        _active.release()
+        st.caption("⏱️ Profiling skipped: another profiler is active.")
+        yield None
+        return
+
+    _local.profiler = profiler
+    completed = False
+    try:
+        yield profiler
+        completed = True
+    finally:
+        profiler.profile.disable()
+        _local.profiler = None
+        _active.release()
+        path = profiler.save()
+    # 예외/리런 중단 시에는 .prof 파일만 남기고 표는 그리지 않음
+    if completed:
+        report_rerun_profile(profiler, path, top_n)
+
+
+def section(name: str):
+    """구간 시간 측정 (예: create_map, st_folium, json.dumps, HTML 템플릿)."""
+    profiler = getattr(_local, "profiler", None)
+    return _NULL if profiler is None else profiler.section(name)
+
+
+def report_rerun_profile(profiler: RerunProfiler, path: str, top_n: int = TOP_N):
+    total = time.perf_counter() - profiler.started
+    with st.expander(f"⏱️ Profiling : {total * 1000:.0f} ms", expanded=True):
+        st.caption(f"cProfile → `{path}`")
+        if profiler.sections:
+            st.dataframe(
+                [{"section": n, "ms": round(s * 1000, 2)} for n, s in profiler.sections],
+                use_container_width=True,
+            )
+        st.dataframe(profiler.hotspots(top_n), use_container_width=True)
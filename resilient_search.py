@@ -0,0 +1,251 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import numpy as np
+import requests
+
+from coords import decode_batch
+from naver_search import NaverSearchError, fetch_naver_places
+
+# =========================================================
+# 지연 시간 상한이 있는 장소 검색 (네이버 → 카카오 폴백)
+# =========================================================
+# - 호출마다 엄격한 타임아웃 (제공자별 budget, 전체 deadline)
+# - 첫 요청이 최근 지연 시간 p95가 지나도 진행 중이면 같은 요청을 한 번 더 보냄 (hedging)
+#   (첫 요청이 이미 실패했거나 4xx 응답이면 다시 보내지 않음)
+# - limiter를 주면 hedge/폴백을 포함한 모든 원격 요청이 보내기 전에 limiter.acquire()를 거침
+# - 연속 실패 시 회로 차단기(circuit breaker)가 열려 일정 시간 해당 제공자를 건너뜀
+# - 네이버가 실패/차단/시간 초과면 카카오 로컬 검색으로 자동 폴백
+# - 네이버 지역 검색은 위치를 받지 않으므로, "내 주변" 검색(prefer_location)은 카카오를 먼저 시도
+
+KAKAO_LOCAL_URL = "https://dapi.kakao.com/v2/local/search/keyword.json"
+
+SEARCH_DEADLINE_S = 3.0       # 검색 한 번의 전체 상한
+PROVIDER_BUDGET_S = 1.5       # 제공자 하나에 쓰는 최대 시간
+DEFAULT_HEDGE_DELAY_S = 0.4   # 지연 표본이 부족할 때의 hedge 대기 시간
+MIN_LATENCY_SAMPLES = 20
+BREAKER_FAILURES = 5          # 연속 실패 횟수 -> 차단
+BREAKER_COOLDOWN_S = 30.0     # 차단 후 재시도(half-open)까지 대기
+
+
+class SearchUnavailable(Exception):
+    """모든 검색 제공자가 deadline 안에 응답하지 못한 경우."""
+
+
+def fetch_kakao_places(query, rest_api_key, size=10, timeout=PROVIDER_BUDGET_S, lat=None, lng=None):
+    """카카오 로컬 키워드 검색 (위치가 있으면 가까운 순). 결과 형식은 fetch_naver_places와 같습니다."""
+    headers = {"Authorization": f"KakaoAK {rest_api_key}"}
+    params = {"query": query, "size": size}
+    if lat and lng:
+        params.update({"x": lng, "y": lat, "sort": "distance"})
+    response = requests.get(KAKAO_LOCAL_URL, headers=headers, params=params, timeout=timeout)
+    response.raise_for_status()
+
+    docs = response.json().get("documents", [])
+    lats, lngs, valid = decode_batch("kakao", docs)
+
+    results = []
+    for i in np.flatnonzero(valid):
+        doc = docs[i]
+        results.append({
+            "title": doc.get("place_name", ""),
+            "address": doc.get("road_address_name", "") or doc.get("address_name", ""),
+            "category": doc.get("category_name", ""),
+            "lat": float(lats[i]),
+            "lng": float(lngs[i])
+        })
+    return results
+
+
+def client_error_status(error: Exception) -> int | None:
+    """4xx 응답 오류면 상태 코드를, 아니면 None을 돌려줍니다 (같은 요청을 다시 보내도 소용없는 오류)."""
+    if isinstance(error, NaverSearchError):
+        status = error.status_code
+    elif isinstance(error, requests.HTTPError) and error.response is not None:
+        status = error.response.status_code
+    else:
+        return None
+    return status if 400 <= status < 500 else None
+
+
+class LatencyTracker:
+    """최근 성공 호출의 지연 시간으로 p95를 계산합니다."""
+
+    def __init__(self, maxlen: int = 200):
+        self.samples = deque(maxlen=maxlen)
+        self.lock = threading.Lock()
+
+    def add(self, seconds: float):
+        with self.lock:
+            self.samples.append(seconds)
+
+    def p95(self) -> float | None:
+        with self.lock:
+            if len(self.samples) < MIN_LATENCY_SAMPLES:
+                return None
+            ordered = sorted(self.samples)
+        return ordered[int(0.95 * (len(ordered) - 1))]
+
+
+class CircuitBreaker:
+    """closed -> (연속 실패) open -> (cooldown 후) half-open 1회 시도 -> closed/open."""
+
+    def __init__(self, failures: int = BREAKER_FAILURES, cooldown: float = BREAKER_COOLDOWN_S):
+        self.max_failures = failures
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self.trial_running = False
+        self.lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self.lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at < self.cooldown or self.trial_running:
+                return False
+            self.trial_running = True  # half-open: 시험 호출 하나만 통과
+            return True
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial_running = False
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            self.trial_running = False
+            if self.opened_at is not None or self.failures >= self.max_failures:
+                self.opened_at = time.monotonic()
+
+
+class Provider:
+    def __init__(self, name, fetch, pool, uses_location=False, limiter=None):
+        self.name = name
+        self.fetch = fetch    # fetch(query, timeout, lat, lng) -> list[dict]
+        self.pool = pool
+        self.uses_location = uses_location  # 결과가 lat/lng에 따라 달라지는지
+        self.limiter = limiter              # acquire()로 요청 수를 제한 (예: geosearch_batch.RateLimiter)
+        self.latency = LatencyTracker()
+        self.breaker = CircuitBreaker()
+
+    def _timed(self, query, timeout, lat, lng):
+        if self.limiter is not None:
+            self.limiter.acquire()
+        started = time.monotonic()
+        result = self.fetch(query, timeout, lat, lng)
+        self.latency.add(time.monotonic() - started)
+        return result
+
+    def hedge_delay(self, budget: float) -> float:
+        p95 = self.latency.p95()
+        delay = DEFAULT_HEDGE_DELAY_S if p95 is None else p95
+        return min(max(delay, 0.05), budget / 2)
+
+    def call(self, query, budget: float, lat=None, lng=None):
+        """
+        budget 안에서 첫 요청 + hedge 요청 중 먼저 성공한 결과를 돌려줍니다.
+        hedge는 첫 요청이 p95 지연이 지나도록 진행 중일 때만 한 번 보냅니다.
+        4xx 응답은 다시 보내도 같으므로 바로 던집니다 (429 외에는 차단기 실패로 세지 않음).
+        """
+        started = time.monotonic()
+        end = started + budget
+        hedge_at = started + self.hedge_delay(budget)
+        pending = {self.pool.submit(self._timed, query, budget, lat, lng)}
+        hedged = False
+        error = None
+
+        while pending:
+            now = time.monotonic()
+            if now >= end:
+                break
+            timeout = end - now if hedged else max(min(end, hedge_at) - now, 0)
+            done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            for f in done:
+                try:
+                    result = f.result()
+                except Exception as e:
+                    status = client_error_status(e)
+                    if status is not None:
+                        if status == 429:
+                            self.breaker.record_failure()
+                        else:
+                            self.breaker.record_success()   # 제공자는 정상적으로 응답함
+                        raise
+                    error = e
+                    continue
+                self.breaker.record_success()
+                return result
+
+            now = time.monotonic()
+            if not hedged and pending and hedge_at <= now < end:
+                pending.add(self.pool.submit(self._timed, query, end - now, lat, lng))
+                hedged = True
+
+        self.breaker.record_failure()
+        raise error or TimeoutError(f"{self.name}: {budget:.1f}s 안에 응답 없음")
+
+
+class ResilientSearch:
+    """
+    제공자 목록을 순서대로 시도하는 검색기.
+    fetch(query, lat, lng)는 naver_search.search_places의 fetcher로,
+    fetch_located는 prefetch.CachedFetcher의 fetcher로 사용합니다.
+    """
+
+    def __init__(self, providers: list[Provider], deadline: float = SEARCH_DEADLINE_S):
+        self.providers = providers
+        self.deadline = deadline
+
+    @classmethod
+    def from_keys(cls, naver_client_id, naver_client_secret, kakao_rest_key=None, max_workers=8, limiter=None):
+        pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="search")
+        providers = [Provider(
+            "naver",
+            lambda q, t, lat, lng: fetch_naver_places(q, naver_client_id, naver_client_secret, timeout=t),
+            pool,
+            limiter=limiter,
+        )]
+        if kakao_rest_key:
+            providers.append(Provider(
+                "kakao",
+                lambda q, t, lat, lng: fetch_kakao_places(q, kakao_rest_key, timeout=t, lat=lat, lng=lng),
+                pool,
+                uses_location=True,
+                limiter=limiter,
+            ))
+        return cls(providers)
+
+    def fetch(self, query, lat=None, lng=None):
+        return self.fetch_located(query, lat, lng)[0]
+
+    def fetch_located(self, query, lat=None, lng=None, prefer_location=False):
+        """
+        (결과, 위치 반영 여부)를 돌려줍니다. 위치 반영 여부가 False면 결과는 lat/lng와 무관합니다.
+        prefer_location이면 위치를 쓰는 제공자를 먼저 시도합니다 (주변 카테고리 프리페치).
+        """
+        located = bool(lat and lng)
+        providers = self.providers
+        if prefer_location and located:
+            providers = sorted(providers, key=lambda p: not p.uses_location)
+
+        end = time.monotonic() + self.deadline
+        errors = []
+        for provider in providers:
+            remaining = end - time.monotonic()
+            if remaining <= 0:
+                break
+            if not provider.breaker.allow():
+                errors.append(f"{provider.name}: circuit open")
+                continue
+            try:
+                results = provider.call(query, min(remaining, PROVIDER_BUDGET_S), lat, lng)
+            except Exception as e:
+                errors.append(f"{provider.name}: {e}")
+                continue
+            return results, provider.uses_location and located
+        raise SearchUnavailable("; ".join(errors) or "검색 deadline 초과")
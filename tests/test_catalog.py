@@ -0,0 +1,159 @@
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+from catalog_fr import CatalogStore, diff_catalog, load_catalog
+
+
+def write_catalog(path, cities, stamp):
+    path.write_text(json.dumps({"cities": cities}, ensure_ascii=False), encoding="utf-8")
+    os.utime(path, ns=(stamp, stamp))
+
+
+def resto(pid, name, rating=4.0, area="A"):
+    return {"id": pid, "name": name, "area": area, "lat": 33.4, "lng": 126.5, "type": "Resto",
+            "rating": rating, "desc_fr": "", "menu": []}
+
+
+def spot(pid, name, area="A"):
+    return {"id": pid, "name": name, "area": area, "lat": 33.4, "lng": 126.5, "type": "Spot",
+            "price_krw": 0, "desc_fr": ""}
+
+
+def city(spots, restos, routes=None):
+    return {
+        "areas": ["A", "B"],
+        "map_center": [33.4, 126.5],
+        "map_level": 10,
+        "spots": spots,
+        "restos": restos,
+        "routes": routes or {"2D1N": [{"day": "Jour 1", "spots": [s["name"] for s in spots]}]},
+    }
+
+
+@pytest.fixture
+def store(tmp_path):
+    path = tmp_path / "catalog.json"
+    write_catalog(path, {"Jeju": city([spot("s0", "Hallasan"), spot("s1", "Manjanggul")],
+                                      [resto("r0", "Olle"), resto("r1", "Dombe")])}, 10 ** 18)
+    return CatalogStore(str(path))
+
+
+def reload(store, cities, stamp):
+    write_catalog(Path(store.path), cities, stamp)
+    return store.poll(force=True)
+
+
+def test_bundled_catalog_loads():
+    city_data, city_routes = load_catalog()
+    assert set(city_data) == set(city_routes)
+    for key, data in city_data.items():
+        names = {s["name"] for s in data["spots"]}
+        for days in city_routes[key].values():
+            assert all(nm in names for d in days for nm in d["spots"])
+
+
+def test_unchanged_file_is_ignored(store):
+    assert store.poll(force=True) is None
+
+
+def test_only_changed_records_are_replaced(store):
+    jeju = store.city_data["Jeju"]
+    unchanged = jeju["restos"][1]
+    seen = []
+    store.subscribe(seen.append)
+
+    change = reload(store, {"Jeju": city([spot("s0", "Hallasan"), spot("s1", "Manjanggul")],
+                                         [resto("r0", "Olle", rating=4.8), resto("r1", "Dombe")])}, 2 * 10 ** 18)
+
+    assert [(k, o["id"], n["rating"]) for _, k, o, n in change.records] == [("restos", "r0", 4.8)]
+    assert not change.cities and not change.routes and not change.reordered
+    assert seen == [change]
+    assert store.city_data["Jeju"] is jeju
+    assert jeju["restos"][0]["rating"] == 4.8
+    assert jeju["restos"][1] is unchanged
+
+
+def test_removals_come_first_and_lookup_follows_renames(store):
+    change = reload(store, {"Jeju": city([spot("s0", "Halla"), spot("s1", "Manjanggul")],
+                                         [resto("r1", "Dombe"), resto("r2", "New")])}, 2 * 10 ** 18)
+
+    assert change.records[0][3] is None and change.records[0][2]["id"] == "r0"
+    assert store.spot_by_name("Jeju", "Hallasan") is None
+    assert store.spot_by_name("Jeju", "Halla")["id"] == "s0"
+    assert [p["id"] for p in store.city_data["Jeju"]["restos"]] == ["r1", "r2"]
+    assert "2D1N" in change.routes["Jeju"]
+
+
+def test_reorder_only_edit_is_applied(store):
+    change = reload(store, {"Jeju": city([spot("s0", "Hallasan"), spot("s1", "Manjanggul")],
+                                         [resto("r1", "Dombe"), resto("r0", "Olle")])}, 2 * 10 ** 18)
+
+    assert change and not change.records and change.reordered == {"Jeju"}
+    assert [p["id"] for p in store.city_data["Jeju"]["restos"]] == ["r1", "r0"]
+
+
+def test_append_at_end_is_not_a_reorder():
+    old = {"Jeju": city([], [resto("r0", "Olle")])}
+    new = {"Jeju": city([], [resto("r0", "Olle"), resto("r1", "Dombe")])}
+    change = diff_catalog(old, {"Jeju": old["Jeju"]["routes"]}, new, {"Jeju": new["Jeju"]["routes"]})
+    assert not change.reordered
+
+
+def without(record, key):
+    return {k: v for k, v in record.items() if k != key}
+
+
+@pytest.mark.parametrize("bad", [
+    "{broken",
+    json.dumps({"cities": {"Jeju": city([spot("s1", "Hallasan")], [resto("s1", "Olle")])}}),
+    json.dumps({"cities": {"Jeju": city([spot("s0", "Hallasan")], [without(resto("r0", "Olle"), "lat")])}}),
+])
+def test_invalid_file_keeps_current_catalog(store, bad):
+    before = [p["id"] for p in store.city_data["Jeju"]["restos"]]
+    stamp = store.stamp
+    path = Path(store.path)
+    path.write_text(bad, encoding="utf-8")
+    os.utime(path, ns=(3 * 10 ** 18,) * 2)
+
+    assert store.poll(force=True) is None
+    assert store.last_error
+    assert store.stamp == stamp
+    assert [p["id"] for p in store.city_data["Jeju"]["restos"]] == before
+
+
+@pytest.mark.parametrize("kind, record", [
+    ("spots", without(spot("s9", "X"), "price_krw")),
+    ("spots", {**spot("s9", "X"), "lng": "126.5"}),
+    ("spots", {**spot("s9", "X"), "type": "Resto"}),
+    ("restos", without(resto("r9", "X"), "rating")),
+    ("restos", {**resto("r9", "X"), "menu": [{"name": "Gogi"}]}),
+    ("restos", without(resto("r9", "X"), "name")),
+])
+def test_record_with_missing_or_mistyped_field_is_rejected(tmp_path, kind, record):
+    spots, restos = [spot("s0", "Hallasan")], [resto("r0", "Olle")]
+    (spots if kind == "spots" else restos).append(record)
+    path = tmp_path / "catalog.json"
+    write_catalog(path, {"Jeju": city(spots, restos)}, 10 ** 18)
+
+    with pytest.raises(ValueError, match=r"Jeju/%s\[1\]" % kind):
+        load_catalog(str(path))
+
+
+def test_failing_listener_does_not_skip_the_others(store):
+    seen = []
+
+    def broken(change):
+        raise RuntimeError("boom")
+
+    store.subscribe(broken)
+    store.subscribe(seen.append)
+    change = reload(store, {"Jeju": city([spot("s0", "Hallasan"), spot("s1", "Manjanggul")],
+                                         [resto("r0", "Olle", rating=4.8), resto("r1", "Dombe")])}, 2 * 10 ** 18)
+
+    assert seen == [change]
+    assert "boom" in store.last_error
+    assert store.city_data["Jeju"]["restos"][0]["rating"] == 4.8
+    assert store.poll(force=True) is None
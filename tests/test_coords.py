@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from coords import KOREA_BOUNDS, decode_batch, haversine_km, tm128_to_wgs84
+
+# PROJ 기준값: +proj=tmerc +lat_0=38 +lon_0=128 +k=0.9999 +x_0=400000 +y_0=600000 +ellps=bessel
+#             +towgs84=-115.80,474.99,674.11,1.16,-2.31,-1.63,6.43 -> EPSG:4326
+TM128_REFERENCE = [
+    # (x, y) -> (lat, lng)
+    ((309947.0, 552092.0), (37.56667159266222, 126.9784149463845)),   # 서울시청 부근
+    ((160000.0, 50000.0), (33.018661444500566, 125.42928269870671)),  # 제주 남서쪽 해상
+]
+
+
+@pytest.mark.parametrize("xy, expected", TM128_REFERENCE)
+def test_tm128_matches_proj(xy, expected):
+    lat, lng = tm128_to_wgs84(np.array([xy[0]]), np.array([xy[1]]))
+    # 1e-7도 ~= 1cm
+    assert lat[0] == pytest.approx(expected[0], abs=1e-7)
+    assert lng[0] == pytest.approx(expected[1], abs=1e-7)
+
+
+def test_naver_decoder_handles_wgs84_and_legacy_tm128():
+    items = [
+        {"mapx": "1269784149", "mapy": "375666716"},   # WGS84 * 1e7
+        {"mapx": "309947", "mapy": "552092"},          # 구 응답 TM128
+        {"mapx": "", "mapy": ""},                      # 좌표 없음
+    ]
+    lat, lng, valid = decode_batch("naver", items)
+    assert valid.tolist() == [True, True, False]
+    assert lat[0] == pytest.approx(37.5666716)
+    assert lat[1] == pytest.approx(TM128_REFERENCE[0][1][0], abs=1e-7)
+    assert lng[1] == pytest.approx(TM128_REFERENCE[0][1][1], abs=1e-7)
+
+
+def test_out_of_bounds_points_are_invalid():
+    items = [{"x": "139.69", "y": "35.68"}, {"x": "126.97", "y": "37.56"}]   # 도쿄, 서울
+    _, _, valid = decode_batch("kakao", items, KOREA_BOUNDS)
+    assert valid.tolist() == [False, True]
+
+
+def test_haversine_seoul_busan():
+    d = haversine_km(37.5665, 126.9780, [35.1796], [129.0756])
+    assert d[0] == pytest.approx(325, abs=5)
@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+
+from density_bins import SQRT3, DensityBinner, aggregate, cell_size_m, to_mercator
+
+
+def jeju_points(n=2000, seed=0):
+    rng = np.random.default_rng(seed)
+    lat = 33.25 + rng.random(n) * 0.3
+    lng = 126.2 + rng.random(n) * 0.7
+    rating = np.round(3.5 + rng.random(n) * 1.5, 1)
+    rating[::7] = np.nan     # 평점 없는 점
+    return lat, lng, rating
+
+
+@pytest.mark.parametrize("kind", ["hex", "square"])
+@pytest.mark.parametrize("zoom", [9, 12, 15])
+def test_counts_are_conserved(kind, zoom):
+    lat, lng, rating = jeju_points()
+    cells = aggregate(lat, lng, zoom, rating, kind)
+    assert cells["count"].sum() == len(lat)
+    assert cells["intensity"].max() == 1.0
+    assert cells["ring_lat"].shape == (len(cells["count"]), 7 if kind == "hex" else 5)
+
+
+@pytest.mark.parametrize("zoom", [10, 13])
+def test_every_point_lies_in_a_hex_cell(zoom):
+    lat, lng, _ = jeju_points(500)
+    cells = aggregate(lat, lng, zoom, kind="hex")
+    px, py = to_mercator(lat, lng)
+    cx, cy = to_mercator(cells["center_lat"], cells["center_lng"])
+    nearest = np.min(np.hypot(px[:, None] - cx[None, :], py[:, None] - cy[None, :]), axis=1)
+    assert np.all(nearest <= cell_size_m(zoom) / SQRT3 * (1 + 1e-9))   # 외접원 반지름 이내
+
+
+def test_square_cells_contain_their_points():
+    lat, lng, _ = jeju_points(500)
+    cells = aggregate(lat, lng, 12, kind="square")
+    inside = ((lat[:, None] >= cells["ring_lat"].min(axis=1)) & (lat[:, None] <= cells["ring_lat"].max(axis=1))
+              & (lng[:, None] >= cells["ring_lng"].min(axis=1)) & (lng[:, None] <= cells["ring_lng"].max(axis=1)))
+    assert np.all(inside.sum(axis=1) >= 1)
+
+
+def test_mean_rating_ignores_missing_values():
+    lat = np.array([33.5, 33.5, 33.5])
+    lng = np.array([126.5, 126.5, 126.5])
+    cells = aggregate(lat, lng, 12, np.array([4.0, np.nan, 5.0]))
+    assert list(cells["count"]) == [3]
+    assert cells["mean_rating"][0] == pytest.approx(4.5)
+
+    cells = aggregate(lat[:1], lng[:1], 12, np.array([np.nan]))
+    assert np.isnan(cells["mean_rating"][0])
+
+
+def test_empty_input_and_unknown_kind():
+    cells = aggregate([], [], 12)
+    assert cells["count"].size == 0
+    with pytest.raises(ValueError):
+        aggregate([33.5], [126.5], 12, kind="triangle")
+
+
+def test_cells_are_stable_when_points_are_added_elsewhere():
+    lat, lng, _ = jeju_points(200)
+    before = aggregate(lat, lng, 13)
+    after = aggregate(np.append(lat, 37.5), np.append(lng, 127.0), 13)   # 서울에 점 하나 추가
+    assert before["count"].sum() + 1 == after["count"].sum()
+    kept = set(zip(np.round(before["center_lat"], 9), np.round(before["center_lng"], 9)))
+    assert kept <= set(zip(np.round(after["center_lat"], 9), np.round(after["center_lng"], 9)))
+
+
+def test_binner_caches_per_dataset_and_zoom():
+    lat, lng, rating = jeju_points(300)
+    points = [{"lat": a, "lng": b, "rating": None if np.isnan(r) else r} for a, b, r in zip(lat, lng, rating)]
+    binner = DensityBinner(max_entries=2)
+
+    first = binner.geojson(points, 12)
+    assert binner.geojson([dict(p) for p in points], 12) is first       # 같은 데이터셋 -> 캐시
+    assert sum(f["properties"]["count"] for f in first["features"]) == len(points)
+
+    moved = points[:-1] + [{**points[-1], "rating": 1.0}]
+    assert binner.geojson(moved, 12) is not first                       # 평점이 바뀌면 다른 키
+    binner.geojson(points, 13)                                          # LRU에서 첫 항목 밀려남
+    assert len(binner._cache) == 2
+    assert binner.geojson(points, 12) is not first
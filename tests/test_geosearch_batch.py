@@ -0,0 +1,123 @@
+import argparse
+import json
+
+import pytest
+
+pytest.importorskip("dotenv")
+pytest.importorskip("requests")
+
+import geosearch_batch  # noqa: E402
+from catalog_fr import CITY_DATA  # noqa: E402
+from geosearch_batch import RateLimiter, check_column, iter_queries, load_checkpoint, resolve  # noqa: E402
+from place_search import LocalSearchIndex, catalog_documents  # noqa: E402
+
+
+def batch_args(**overrides):
+    args = {"retries": 1, "lat": None, "lng": None, "top": 1}
+    args.update(overrides)
+    return argparse.Namespace(**args)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """time.monotonic / time.sleep를 가짜 시계로 바꿉니다 (sleep은 시계만 앞으로)."""
+    now = [1000.0]
+    slept = []
+
+    def sleep(seconds):
+        slept.append(seconds)
+        now[0] += seconds
+
+    monkeypatch.setattr(geosearch_batch.time, "monotonic", lambda: now[0])
+    monkeypatch.setattr(geosearch_batch.time, "sleep", sleep)
+    return slept
+
+
+def test_rate_limiter_spaces_requests(clock):
+    limiter = RateLimiter(4)
+    for _ in range(5):
+        limiter.acquire()
+    assert clock == [0.25, 0.25, 0.25, 0.25]
+
+
+def test_rate_limiter_zero_means_unlimited(clock):
+    limiter = RateLimiter(0)
+    for _ in range(5):
+        limiter.acquire()
+    assert clock == []
+
+
+def test_iter_queries_jsonl_records_bad_lines(tmp_path):
+    path = tmp_path / "in.jsonl"
+    path.write_text('{"name": "Olle"}\n\n{broken\n"Hallasan"\n{"name": 42}\n', encoding="utf-8")
+    rows = list(iter_queries(str(path), "name"))
+    assert [(row, query) for row, query, _ in rows] == [(0, "Olle"), (2, "{broken"), (3, "Hallasan"), (4, "42")]
+    assert [row for row, _, error in rows if error] == [2]
+
+
+def test_check_column_exits_when_missing(tmp_path):
+    csv_path = tmp_path / "in.csv"
+    csv_path.write_text("name,city\nOlle,Jeju\n", encoding="utf-8")
+    jsonl_path = tmp_path / "in.jsonl"
+    jsonl_path.write_text('{broken\n{"name": "Olle"}\n', encoding="utf-8")
+
+    check_column(str(csv_path), "name")
+    check_column(str(jsonl_path), "name")
+    with pytest.raises(SystemExit):
+        check_column(str(csv_path), "nmae")
+    with pytest.raises(SystemExit):
+        check_column(str(jsonl_path), "query")
+
+
+def test_resolve_keeps_local_hits_when_remote_fails(clock):
+    def failing(query, lat, lng):
+        raise ConnectionError("down")
+
+    index = LocalSearchIndex(catalog_documents(CITY_DATA))
+    out = resolve(0, "Hallasan", batch_args(), index, "id", "secret", failing)
+
+    assert out["status"] == "ok"
+    assert out["results"][0]["title"].startswith("Hallasan")
+    assert out["error"] == "down"
+    assert clock == []                      # 로컬 결과가 있으면 재시도하지 않음
+
+
+def test_resolve_retries_then_reports_remote_error(clock):
+    calls = []
+
+    def failing(query, lat, lng):
+        calls.append(query)
+        raise ConnectionError("down")
+
+    out = resolve(3, "zzz", batch_args(retries=2), None, "id", "secret", failing)
+    assert (out["status"], out["error"], out["results"]) == ("error", "down", [])
+    assert len(calls) == 3 and clock == [1, 2]
+
+
+def test_resume_skips_checkpointed_rows(tmp_path, monkeypatch):
+    source = tmp_path / "in.jsonl"
+    source.write_text("".join(json.dumps({"query": q}) + "\n" for q in ["a", "b", "c"]), encoding="utf-8")
+    output = tmp_path / "out.jsonl"
+    flaky = {"b"}
+    seen = []
+
+    def fake_resolve(row, query, args, *rest):
+        seen.append(row)
+        status = "error" if query in flaky else "ok"
+        return {"row": row, "query": query, "status": status, "error": None, "results": []}
+
+    monkeypatch.setenv("NAVER_CLIENT_ID", "id")
+    monkeypatch.setattr(geosearch_batch, "resolve", fake_resolve)
+    argv = [str(source), str(output), "--no-local", "--rate", "0", "--concurrency", "1"]
+
+    geosearch_batch.main(argv)
+    assert load_checkpoint(str(output) + ".ckpt") == {0, 2}
+
+    with pytest.raises(SystemExit):         # --resume 없이 덮어쓰지 않음
+        geosearch_batch.main(argv)
+
+    flaky.clear()
+    seen.clear()
+    geosearch_batch.main(argv + ["--resume"])
+    assert seen == [1]
+    assert load_checkpoint(str(output) + ".ckpt") == {0, 1, 2}
@@ -0,0 +1,139 @@
+import json
+
+from catalog_fr import CITY_DATA, CITY_ROUTES, CatalogChange, spot_by_name
+from map_bundles import MapBundleCache, bundle_key
+
+
+def first_route(city_key):
+    return next(iter(CITY_ROUTES[city_key]))
+
+
+def test_bundles_are_built_lazily_and_reused():
+    cache = MapBundleCache(CITY_DATA, CITY_ROUTES, spot_by_name)
+    city_key = next(iter(CITY_DATA))
+    route = first_route(city_key)
+    assert not cache._bundles and not cache.indexes
+
+    bundle = cache.get(city_key, route, "Tous", 3.5, True)
+    assert cache.get(city_key, route, "Tous", 3.5, True) is bundle
+    assert list(cache._bundles) == [bundle_key(city_key, route, "Tous", 3.5, True)]
+    assert list(cache.indexes) == [city_key]
+
+
+def test_payloads_are_plain_json_strings():
+    cache = MapBundleCache(CITY_DATA, CITY_ROUTES, spot_by_name)
+    city_key = next(iter(CITY_DATA))
+    bundle = cache.get(city_key, first_route(city_key), "Tous", 3.5, True)
+
+    items = json.loads(bundle["map_items_json"])
+    details = json.loads(bundle["details_json"])
+    assert "</" not in bundle["details_json"]
+    assert set(details) == set(items["id"])
+    assert len(items["lat"]) == len(items["lng"]) == len(items["type"]) == len(items["id"])
+
+
+def test_lru_keeps_at_most_max_entries():
+    cache = MapBundleCache(CITY_DATA, CITY_ROUTES, spot_by_name, max_entries=2)
+    city_key = next(iter(CITY_DATA))
+    route = first_route(city_key)
+    cache.get(city_key, route, "Tous", 3.5, True)
+    cache.get(city_key, route, "Tous", 4.0, True)
+    cache.get(city_key, route, "Tous", 3.5, True)   # 최근 사용으로 갱신
+    cache.get(city_key, route, "Tous", 4.5, True)
+
+    assert list(cache._bundles) == [
+        bundle_key(city_key, route, "Tous", 3.5, True),
+        bundle_key(city_key, route, "Tous", 4.5, True),
+    ]
+
+
+def resto(pid, name, rating=4.0, area="A"):
+    return {"id": pid, "name": name, "area": area, "lat": 33.4, "lng": 126.5, "type": "Resto",
+            "rating": rating, "desc_fr": "", "menu": []}
+
+
+def spot(pid, name, area="A"):
+    return {"id": pid, "name": name, "area": area, "lat": 33.4, "lng": 126.5, "type": "Spot",
+            "price_krw": 0, "desc_fr": ""}
+
+
+def small_cache():
+    city_data = {"Jeju": {"areas": ["A", "B"], "map_center": (33.4, 126.5), "map_level": 10,
+                          "spots": [spot("s0", "Hallasan"), spot("s1", "Manjanggul")],
+                          "restos": [resto("r0", "Olle", 4.5), resto("r1", "Dombe", 3.8, area="B")]}}
+    city_routes = {"Jeju": {"2D1N": [{"day": "Jour 1", "spots": ["Hallasan"]}],
+                            "3D2N": [{"day": "Jour 1", "spots": ["Manjanggul"]}]}}
+    by_name = lambda c, nm: next((s for s in city_data[c]["spots"] if s["name"] == nm), None)
+    return MapBundleCache(city_data, city_routes, by_name), city_data
+
+
+def edit(city_data, kind, old, new):
+    """catalog_fr.CatalogStore._apply처럼 목록을 제자리에서 바꾸고 CatalogChange를 만듭니다."""
+    records = city_data["Jeju"][kind]
+    if old is None:
+        records.append(new)
+    else:
+        i = next(i for i, p in enumerate(records) if p["id"] == old["id"])
+        records[i:i + 1] = [new] if new is not None else []
+    change = CatalogChange()
+    change.records.append(("Jeju", kind, old, new))
+    return change
+
+
+def test_affected_matches_area_rating_and_route():
+    cache, city_data = small_cache()
+    change = CatalogChange()
+    change.records.append(("Jeju", "restos", city_data["Jeju"]["restos"][1], None))   # B, 3.8
+
+    assert cache.affected(bundle_key("Jeju", "2D1N", "Tous", 3.5, True), change)
+    assert cache.affected(bundle_key("Jeju", "2D1N", "B", 3.8, False), change)
+    assert not cache.affected(bundle_key("Jeju", "2D1N", "A", 3.5, True), change)
+    assert not cache.affected(bundle_key("Jeju", "2D1N", "Tous", 4.0, True), change)
+    assert not cache.affected(bundle_key("Seoul", "2D1N", "Tous", 3.5, True), change)
+
+    change = CatalogChange()
+    change.records.append(("Jeju", "spots", city_data["Jeju"]["spots"][1], None))     # 3D2N 일정의 스팟
+    assert cache.affected(bundle_key("Jeju", "3D2N", "Tous", 5.0, False), change)
+    assert not cache.affected(bundle_key("Jeju", "2D1N", "Tous", 5.0, False), change)
+
+    change = CatalogChange()
+    change.routes["Jeju"] = {"2D1N"}
+    assert cache.affected(bundle_key("Jeju", "2D1N", "A", 5.0, False), change)
+    assert not cache.affected(bundle_key("Jeju", "3D2N", "A", 5.0, False), change)
+
+
+def test_apply_catalog_change_drops_only_affected_bundles():
+    cache, city_data = small_cache()
+    high = cache.get("Jeju", "2D1N", "Tous", 4.0, True)
+    low = cache.get("Jeju", "2D1N", "Tous", 3.5, True)
+    assert [r["id"] for r in low["restos"]] == ["r0", "r1"]
+
+    old = city_data["Jeju"]["restos"][1]
+    cache.apply_catalog_change(edit(city_data, "restos", old, {**old, "rating": 3.6}))
+
+    assert cache.get("Jeju", "2D1N", "Tous", 4.0, True) is high
+    rebuilt = cache.get("Jeju", "2D1N", "Tous", 3.5, True)
+    assert rebuilt is not low
+    assert [r["rating"] for r in rebuilt["restos"]] == [4.5, 3.6]
+
+    cache.apply_catalog_change(edit(city_data, "restos", None, resto("r2", "New", 4.9)))
+    assert [r["id"] for r in cache.get("Jeju", "2D1N", "Tous", 4.0, True)["restos"]] == ["r0", "r2"]
+
+
+def test_bundle_built_during_a_change_is_not_cached():
+    cache, city_data = small_cache()
+    build = cache.build
+
+    def build_then_edit(*key):
+        bundle = build(*key)
+        old = city_data["Jeju"]["restos"][0]
+        cache.apply_catalog_change(edit(city_data, "restos", old, {**old, "rating": 4.7}))
+        return bundle
+
+    cache.build = build_then_edit
+    stale = cache.get("Jeju", "2D1N", "Tous", 3.5, True)
+    cache.build = build
+
+    assert not cache._bundles
+    assert cache.get("Jeju", "2D1N", "Tous", 3.5, True)["restos"][0]["rating"] == 4.7
+    assert stale["restos"][0]["rating"] == 4.5
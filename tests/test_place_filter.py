@@ -0,0 +1,88 @@
+import random
+
+from place_filter import PlaceFilterIndex, entry_price_krw, price_bucket
+
+AREAS = ["A", "B", "C"]
+
+
+def make_place(i, rng):
+    kind = rng.choice(["Spot", "Resto"])
+    place = {
+        "id": f"p{i}",
+        "name": f"Place {i}",
+        "area": rng.choice(AREAS),
+        "type": kind,
+        "rating": round(rng.uniform(3.5, 5.0), 1) if rng.random() > 0.1 else None,
+        "price_krw": rng.choice([0, 5000, 15000, 25000, 40000]),
+    }
+    if kind == "Resto":
+        place["menu"] = [{"name": "m", "price_krw": rng.choice([8000, 12000, 22000, 35000])}]
+    return place
+
+
+def brute_force(places, area, min_rating, bucket, place_type):
+    return [
+        p["id"] for p in places
+        if (area is None or p["area"] == area)
+        and (place_type is None or p["type"] == place_type)
+        and (bucket is None or price_bucket(entry_price_krw(p)) == bucket)
+        and (min_rating is None or (p.get("rating") or 0) >= min_rating)
+    ]
+
+
+def assert_matches(index, places):
+    for area in [None] + AREAS:
+        for min_rating in [None, 3.5, 4.0, 4.5, 5.0]:
+            for bucket in [None, 0, 1, 2, 3]:
+                for place_type in [None, "Spot", "Resto"]:
+                    got = [p["id"] for p in index.select(area, min_rating, bucket, place_type)]
+                    assert got == brute_force(places, area, min_rating, bucket, place_type)
+
+
+def test_select_matches_brute_force():
+    rng = random.Random(0)
+    places = [make_place(i, rng) for i in range(60)]
+    assert_matches(PlaceFilterIndex(places), places)
+
+
+def test_upsert_and_remove_match_brute_force():
+    rng = random.Random(1)
+    places = [make_place(i, rng) for i in range(40)]
+    index = PlaceFilterIndex(places)
+    next_id = len(places)
+
+    for _ in range(80):
+        op = rng.choice(["update", "add", "remove"])
+        if op == "update" and places:
+            i = rng.randrange(len(places))
+            changed = make_place(0, rng)
+            changed["id"] = places[i]["id"]
+            places[i] = changed
+            index.upsert(changed)
+        elif op == "add":
+            place = make_place(next_id, rng)
+            next_id += 1
+            places.append(place)   # 새 장소는 끝에 붙음
+            index.upsert(place)
+        elif places:
+            removed = places.pop(rng.randrange(len(places)))
+            index.remove(removed["id"])
+        assert_matches(index, places)
+
+
+def test_remove_unknown_id_is_noop():
+    rng = random.Random(2)
+    places = [make_place(i, rng) for i in range(5)]
+    index = PlaceFilterIndex(places)
+    index.remove("missing")
+    assert_matches(index, places)
+
+
+def test_rebuild_follows_new_order():
+    rng = random.Random(3)
+    places = [make_place(i, rng) for i in range(20)]
+    index = PlaceFilterIndex(places)
+    index.select()
+    rng.shuffle(places)
+    index.rebuild(places)
+    assert_matches(index, places)
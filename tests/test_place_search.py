@@ -0,0 +1,71 @@
+from place_search import LocalSearchIndex, apply_catalog_change, catalog_documents, place_document
+
+
+class Change:
+    def __init__(self, records):
+        self.records = records
+
+
+def make_city():
+    return {
+        "Jeju": {
+            "spots": [
+                {"id": "s0", "name": "Hallasan (한라산)", "area": "Jeju-si", "desc_fr": "Volcan et randonnée."},
+                {"id": "s1", "name": "Plage de Hyeopjae (협재해수욕장)", "area": "Hallim-eup", "desc_fr": "Sable blanc."},
+            ],
+            "restos": [
+                {"id": "r0", "name": "Café Olle (올레카페)", "area": "Seogwipo-si", "desc_fr": "Café au lait.",
+                 "menu": [{"name": "Latte", "price_krw": 5000}]},
+                {"id": "r1", "name": "Heukdwaeji (흑돼지)", "area": "Jeju-si", "desc_fr": "Porc noir grillé.",
+                 "menu": [{"name": "Samgyeopsal", "price_krw": 18000}]},
+            ],
+        }
+    }
+
+
+def ranking(index, query):
+    return [(d["city"], d["place"]["id"], round(score, 9)) for d, score in index.search(query, limit=50)]
+
+
+QUERIES = ["한라산", "카페", "café", "cafes", "plage", "흑돼지", "porc grillé", "latte", "jeju"]
+
+
+def test_accent_and_jamo_matching():
+    index = LocalSearchIndex(catalog_documents(make_city()))
+    assert ranking(index, "cafe")[0][1] == "r0"
+    assert ranking(index, "카ㅍ")[0][1] == "r0"   # 부분 음절
+    assert ranking(index, "흑돼")[0][1] == "r1"
+
+
+def test_incremental_updates_match_rebuild():
+    city_data = make_city()
+    index = LocalSearchIndex(catalog_documents(city_data))
+    jeju = city_data["Jeju"]
+
+    old_spot = jeju["spots"][0]
+    new_spot = dict(old_spot, name="Seongsan (성산일출봉)", desc_fr="Lever du soleil.")
+    jeju["spots"][0] = new_spot
+    added = {"id": "r2", "name": "Café Bleu (블루카페)", "area": "Aewol-eup", "desc_fr": "Vue mer.", "menu": []}
+    jeju["restos"].append(added)
+    removed = jeju["restos"].pop(1)
+    apply_catalog_change(index, Change([
+        ("Jeju", "restos", removed, None),
+        ("Jeju", "spots", old_spot, new_spot),
+        ("Jeju", "restos", None, added),
+    ]))
+
+    rebuilt = LocalSearchIndex(catalog_documents(city_data))
+    for query in QUERIES + ["성산", "blanc", "bleu"]:
+        assert sorted(ranking(index, query)) == sorted(ranking(rebuilt, query))
+    assert ranking(index, "한라산") == []
+    assert ranking(index, "흑돼지") == []
+
+
+def test_upsert_same_key_replaces_document():
+    city_data = make_city()
+    index = LocalSearchIndex(catalog_documents(city_data))
+    place = dict(city_data["Jeju"]["restos"][0], name="Boulangerie (빵집)")
+    index.upsert(place_document("Jeju", place))
+    assert index.live_docs == 4
+    assert ranking(index, "빵집")[0][1] == "r0"
+    assert all(doc_id != "r0" for _, doc_id, _ in ranking(index, "올레카페"))
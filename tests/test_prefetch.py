@@ -0,0 +1,127 @@
+import threading
+import time
+
+import pytest
+
+import prefetch
+from prefetch import CachedFetcher, PrefetchWorker, location_cell
+
+JEJU = (33.4996, 126.5312)
+SEOGWIPO = (33.2541, 126.5600)
+
+
+@pytest.fixture(autouse=True)
+def no_pacing(monkeypatch):
+    monkeypatch.setattr(prefetch, "FOREGROUND_QUIET_S", 0.0)
+    monkeypatch.setattr(prefetch, "PREFETCH_MIN_INTERVAL_S", 0.0)
+
+
+class Remote:
+    """fetch_located 흉내: 첫 호출은 gate가 열릴 때까지 대기할 수 있습니다."""
+
+    def __init__(self, uses_location=True):
+        self.uses_location = uses_location
+        self.calls = []
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def __call__(self, query, lat, lng, prefer_location=False):
+        self.calls.append((query, location_cell(lat, lng)))
+        self.gate.wait(5)
+        located = self.uses_location and bool(lat and lng)
+        return [{"title": f"{query}@{lat}", "lat": lat or 0.0, "lng": lng or 0.0}], located
+
+
+def wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_sessions_do_not_overwrite_each_others_pending_work():
+    remote = Remote()
+    remote.gate.clear()
+    worker = PrefetchWorker(CachedFetcher(remote), categories=("카페", "편의점"))
+
+    worker.submit_location(*JEJU)
+    wait_for(lambda: remote.calls)              # 워커가 첫 작업에서 대기 중
+    worker.submit_location(*SEOGWIPO)           # 다른 세션
+    worker.submit_location(*JEJU)               # 같은 셀 재요청은 중복으로 쌓이지 않음
+    assert list(worker.pending) == [("편의점", location_cell(*JEJU)),
+                                    ("카페", location_cell(*SEOGWIPO)), ("편의점", location_cell(*SEOGWIPO))]
+
+    remote.gate.set()
+    wait_for(lambda: len(remote.calls) == 4 and not worker.pending)
+    assert remote.calls == [(q, location_cell(*loc)) for loc in (JEJU, SEOGWIPO) for q in ("카페", "편의점")]
+
+
+def test_pending_queue_is_bounded_and_drops_oldest():
+    remote = Remote()
+    remote.gate.clear()
+    worker = PrefetchWorker(CachedFetcher(remote), categories=("카페", "편의점"), max_pending=3)
+
+    worker.submit_location(*JEJU)
+    wait_for(lambda: remote.calls)
+    worker.submit_location(*SEOGWIPO)
+    worker.submit_location(37.5665, 126.9780)
+    assert len(worker.pending) == 3
+    assert ("편의점", location_cell(*JEJU)) not in worker.pending
+    remote.gate.set()
+
+
+def test_cached_locations_are_not_queued():
+    remote = Remote()
+    fetcher = CachedFetcher(remote)
+    fetcher("카페", *JEJU)
+    worker = PrefetchWorker(fetcher, categories=("카페",))
+    worker.submit_location(*JEJU)
+    assert not worker.pending
+    assert len(remote.calls) == 1
+
+
+def test_located_results_are_cached_per_cell():
+    remote = Remote(uses_location=True)
+    fetcher = CachedFetcher(remote)
+
+    first = fetcher("카페", *JEJU)
+    first[0]["distance"] = 1.2                       # search_places처럼 결과를 수정해도
+    assert "distance" not in fetcher("카페 ", JEJU[0] + 0.001, JEJU[1])[0]   # 같은 셀 + 정규화된 검색어
+    fetcher("카페", *SEOGWIPO)
+    assert remote.calls == [("카페", location_cell(*JEJU)), ("카페", location_cell(*SEOGWIPO))]
+
+
+def test_unlocated_results_are_shared_across_cells():
+    remote = Remote(uses_location=False)
+    fetcher = CachedFetcher(remote)
+    fetcher("Hallasan", *JEJU)
+    fetcher("hallasan", *SEOGWIPO)
+    fetcher("Hallasan")
+    assert len(remote.calls) == 1
+
+
+def test_warm_prefers_location_and_skips_cached():
+    seen = []
+
+    def remote(query, lat, lng, prefer_location=False):
+        seen.append(prefer_location)
+        return [{"title": query}], True
+
+    fetcher = CachedFetcher(remote)
+    assert fetcher.warm("편의점", *JEJU) is True
+    assert fetcher.warm("편의점", *JEJU) is False
+    assert seen == [True]
+    assert fetcher.last_foreground == 0.0            # 프리페치는 사용자 검색으로 세지 않음
+
+
+def test_cache_entries_expire(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(prefetch.time, "monotonic", lambda: now[0])
+    remote = Remote()
+    fetcher = CachedFetcher(remote, prefetch.SearchResultCache(ttl=60, max_entries=10))
+    fetcher("카페", *JEJU)
+    now[0] += 59
+    fetcher("카페", *JEJU)
+    now[0] += 2
+    fetcher("카페", *JEJU)
+    assert len(remote.calls) == 2
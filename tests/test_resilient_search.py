@@ -0,0 +1,140 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+pytest.importorskip("requests")
+
+import resilient_search  # noqa: E402
+from naver_search import NaverSearchError  # noqa: E402
+from resilient_search import CircuitBreaker, Provider  # noqa: E402
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(resilient_search.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_breaker_opens_after_consecutive_failures(clock):
+    breaker = CircuitBreaker(failures=3, cooldown=30)
+    for _ in range(2):
+        assert breaker.allow()
+        breaker.record_failure()
+    assert breaker.allow()              # 아직 closed
+    breaker.record_failure()
+    assert not breaker.allow()          # open
+
+
+def test_success_resets_failure_count(clock):
+    breaker = CircuitBreaker(failures=2, cooldown=30)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.allow()
+
+
+def test_half_open_allows_single_trial(clock):
+    breaker = CircuitBreaker(failures=1, cooldown=30)
+    breaker.record_failure()
+    clock[0] += 29
+    assert not breaker.allow()
+    clock[0] += 1
+    assert breaker.allow()              # half-open: 시험 호출 하나
+    assert not breaker.allow()          # 시험 중에는 나머지 차단
+
+
+def test_half_open_trial_failure_reopens(clock):
+    breaker = CircuitBreaker(failures=1, cooldown=30)
+    breaker.record_failure()
+    clock[0] += 30
+    assert breaker.allow()
+    breaker.record_failure()
+    assert not breaker.allow()
+    clock[0] += 30
+    assert breaker.allow()
+
+
+def test_half_open_trial_success_closes(clock):
+    breaker = CircuitBreaker(failures=1, cooldown=30)
+    breaker.record_failure()
+    clock[0] += 30
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.allow() and breaker.allow()
+
+
+@pytest.fixture
+def pool():
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        yield executor
+
+
+def make_provider(pool, responses, limiter=None):
+    """responses[i]: i번째 호출에서 (대기 초, 결과 또는 예외)."""
+    calls = []
+
+    def fetch(query, timeout, lat, lng):
+        delay, outcome = responses[len(calls)]
+        calls.append(query)
+        time.sleep(delay)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    provider = Provider("test", fetch, pool, limiter=limiter)
+    provider.hedge_delay = lambda budget: 0.05
+    return provider, calls
+
+
+def test_fast_success_is_not_hedged(pool):
+    provider, calls = make_provider(pool, [(0, ["a"])])
+    assert provider.call("q", budget=1.0) == ["a"]
+    time.sleep(0.1)
+    assert calls == ["q"]
+
+
+def test_slow_first_request_is_hedged(pool):
+    provider, calls = make_provider(pool, [(0.5, ["slow"]), (0, ["hedge"])])
+    assert provider.call("q", budget=1.0) == ["hedge"]
+    assert len(calls) == 2
+
+
+def test_failed_first_request_is_not_resent(pool):
+    provider, calls = make_provider(pool, [(0, ConnectionError("reset")), (0, ["again"])])
+    with pytest.raises(ConnectionError):
+        provider.call("q", budget=1.0)
+    time.sleep(0.1)
+    assert len(calls) == 1
+    assert provider.breaker.failures == 1
+
+
+def test_hedge_still_answers_after_first_fails(pool):
+    provider, calls = make_provider(pool, [(0.2, ConnectionError("reset")), (0.3, ["hedge"])])
+    assert provider.call("q", budget=1.0) == ["hedge"]
+    assert len(calls) == 2
+
+
+def test_client_error_is_raised_without_hedge(pool):
+    provider, calls = make_provider(pool, [(0, NaverSearchError(400)), (0, ["again"])])
+    with pytest.raises(NaverSearchError):
+        provider.call("q", budget=1.0)
+    time.sleep(0.1)
+    assert len(calls) == 1
+    assert provider.breaker.failures == 0
+
+
+class CountingLimiter:
+    def __init__(self):
+        self.tokens = 0
+
+    def acquire(self):
+        self.tokens += 1
+
+
+def test_every_attempt_takes_a_limiter_token(pool):
+    limiter = CountingLimiter()
+    provider, calls = make_provider(pool, [(0.5, ["slow"]), (0, ["hedge"])], limiter=limiter)
+    assert provider.call("q", budget=1.0) == ["hedge"]
+    assert limiter.tokens == len(calls) == 2